@@ -0,0 +1,67 @@
+import math
+import os
+import sys
+import time
+
+import pygame
+from pygame.locals import *
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dome_mesh import dome_mesh
+
+# -------------------------------
+# Per-frame dome draw time: immediate-mode Python loop vs cached NumPy mesh in VBOs
+# -------------------------------
+dome_radius = 300
+grids = [(30, 15), (120, 60), (480, 240)]
+frames_per_run = 30
+
+def draw_immediate(slices, stacks):
+    # The old draw_textured_dome() geometry: sin/cos per vertex, glVertex3f per call
+    glBegin(GL_QUADS)
+    for i in range(stacks):
+        theta0 = (i / stacks) * (math.pi / 2)
+        theta1 = ((i + 1) / stacks) * (math.pi / 2)
+        for j in range(slices):
+            phi0 = (j / slices) * 2 * math.pi
+            phi1 = ((j + 1) / slices) * 2 * math.pi
+            for theta, phi, s, t in ((theta0, phi0, 0, 0), (theta1, phi0, 0, 1),
+                                     (theta1, phi1, 1, 1), (theta0, phi1, 1, 0)):
+                glTexCoord2f(s, t)
+                glVertex3f(dome_radius * math.sin(theta) * math.cos(phi),
+                           dome_radius * math.cos(theta),
+                           dome_radius * math.sin(theta) * math.sin(phi))
+    glEnd()
+
+def time_frames(draw):
+    draw()  # warm-up: builds and uploads the mesh on the VBO path
+    glFinish()
+    start = time.perf_counter()
+    for _ in range(frames_per_run):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        draw()
+        glFinish()
+    return (time.perf_counter() - start) / frames_per_run * 1000.0
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL | HIDDEN)
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    gluPerspective(45, 800/600, 0.1, 3000.0)
+    glMatrixMode(GL_MODELVIEW)
+    gluLookAt(0, dome_radius / 2, 1000, 0, dome_radius / 2, 0, 0, 1, 0)
+    print(f"{'grid':<10} {'immediate ms':>13} {'vbo ms':>8}")
+    for slices, stacks in grids:
+        immediate_ms = time_frames(lambda: draw_immediate(slices, stacks))
+        mesh = dome_mesh(dome_radius, slices, stacks)
+        vbo_ms = time_frames(mesh.draw)
+        mesh.delete()
+        grid = f"{slices}x{stacks}"
+        print(f"{grid:<10} {immediate_ms:>13.3f} {vbo_ms:>8.3f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
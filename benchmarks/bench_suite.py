@@ -0,0 +1,314 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from offscreen import OffscreenContext, platforms, select_platform
+
+# -------------------------------
+# Benchmark suite for GPU-less machines
+# -------------------------------
+# Runs the per-frame work of the dome scripts against synthetic feeds in an
+# offscreen software GL context, so it needs no camera, video files or display:
+#   load_texture                  feed uploads per frame (upload strategy x frame path)
+#   draw_textured_dome            dome draw for each layout variant and LOD level
+#   generate_parabolic_trajectory batch evaluation + store + hit indexes
+#   draw_trajectories             incremental sync + draw of the trajectory rings
+# Results go to stdout (or --output) as one JSON document; pass an earlier
+# document to --compare to print per-case ratios. Example:
+#   python benchmarks/bench_suite.py --platform osmesa --output base.json
+dome_radius = 300
+viewport = (800, 600)
+
+full_params = {
+    "resolutions": {"480p": (640, 480), "720p": (1280, 720), "1080p": (1920, 1080)},
+    "feed_counts": [1, 5, 9],
+    "trajectory_batches": [1, 100, 10000],
+    "stored_trajectories": [1000, 10000, 100000],
+    "iterations": 30,
+}
+quick_params = {
+    "resolutions": {"480p": (640, 480), "720p": (1280, 720)},
+    "feed_counts": [1, 5],
+    "trajectory_batches": [1, 1000],
+    "stored_trajectories": [1000, 10000],
+    "iterations": 10,
+}
+
+# -------------------------------
+# Synthetic feeds
+# -------------------------------
+def synthetic_frames(width, height, count=4, seed=0):
+    # Moving colour bars over noise: distinct frames, so drivers cannot skip
+    # repeated uploads, in OpenCV's BGR order like a decoded capture
+    rng = np.random.default_rng(seed)
+    bars = (np.arange(width) * 8 // max(width, 1)).astype(np.uint8)
+    palette = np.array([[255, 255, 255], [0, 255, 255], [255, 255, 0], [0, 255, 0],
+                        [255, 0, 255], [0, 0, 255], [255, 0, 0], [0, 0, 0]], dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = palette[np.roll(bars, i * width // (8 * count))][None, :, :].repeat(height, axis=0)
+        frame = frame ^ rng.integers(0, 32, (height, width, 3), dtype=np.uint8)
+        frames.append(np.ascontiguousarray(frame))
+    return frames
+
+# -------------------------------
+# Timing
+# -------------------------------
+def measure(fn, iterations, warmup=2, finish=True):
+    # Per-iteration wall time in ms; finish=True waits for the GL pipeline so
+    # deferred driver work is charged to the iteration that caused it
+    if finish:
+        from OpenGL.GL import glFinish
+    for _ in range(warmup):
+        fn()
+    if finish:
+        glFinish()
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        if finish:
+            glFinish()
+        times.append((time.perf_counter() - start) * 1000.0)
+    times = np.array(times)
+    return {"iterations": iterations, "mean_ms": float(times.mean()), "median_ms": float(np.median(times)),
+            "p95_ms": float(np.percentile(times, 95)), "min_ms": float(times.min())}
+
+def result(bench, params, timing):
+    return {"bench": bench, "params": params, **timing}
+
+# -------------------------------
+# Benchmarks
+# -------------------------------
+def bench_load_texture(p):
+    import cv2
+    from OpenGL.GL import GL_BGR, GL_RGB
+    from dome_textures import FeedTextureArray, upload_strategies
+    results = []
+    for label, (width, height) in p["resolutions"].items():
+        frames = synthetic_frames(width, height)
+        for feeds in p["feed_counts"]:
+            for strategy in upload_strategies:
+                for frame_path in ("bgr", "rgb"):
+                    # bgr: upload OpenCV's buffer as is (flip in the shader);
+                    # rgb: the older cv2.flip + cvtColor on the CPU first
+                    feed_array = FeedTextureArray(feeds, strategy, GL_BGR if frame_path == "bgr" else GL_RGB)
+                    tick = [0]
+
+                    def upload_all():
+                        frame = frames[tick[0] % len(frames)]
+                        tick[0] += 1
+                        for layer in range(feeds):
+                            if frame_path == "rgb":
+                                feed_array.upload(layer, cv2.cvtColor(cv2.flip(frame, 0), cv2.COLOR_BGR2RGB))
+                            else:
+                                feed_array.upload(layer, frame)
+                    timing = measure(upload_all, p["iterations"])
+                    feed_array.delete()
+                    results.append(result("load_texture", {"resolution": label, "feeds": feeds,
+                                                           "strategy": strategy, "frame_path": frame_path}, timing))
+    return results
+
+def bench_draw_textured_dome(p):
+    from OpenGL.GL import (GL_BGR, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_LINEAR, GL_RGB8,
+                           GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_TEXTURE_MIN_FILTER,
+                           GL_UNSIGNED_BYTE, glBindTexture, glClear, glColor3f, glDeleteTextures,
+                           glDisable, glEnable, glGenTextures, glTexImage2D, glTexParameteri)
+    from dome_layout import compile_layout, draw_batches, make_layout, shader_regions
+    from dome_mesh import DomeMesh, lod_levels
+    from dome_shaders import AngularFeedProgram, FeedArrayProgram
+    from dome_textures import FeedTextureArray
+    results = []
+    frame = synthetic_frames(640, 480, count=1)[0]
+    for feeds in p["feed_counts"]:
+        videos = max(feeds - 1, 1)
+        feed_array = FeedTextureArray(1 + videos, "subimage", GL_BGR)
+        for layer in range(1 + videos):
+            feed_array.upload(layer, frame)
+        # One GL_TEXTURE_2D per feed for the per-texture batches, as in multicam
+        textures = [glGenTextures(1) for _ in range(1 + videos)]
+        for texture in textures:
+            glBindTexture(GL_TEXTURE_2D, texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, frame.shape[1], frame.shape[0], 0,
+                         GL_BGR, GL_UNSIGNED_BYTE, frame)
+
+        def bind(feed):
+            if feed < 0:
+                glDisable(GL_TEXTURE_2D)
+                glColor3f(0, 0, 0)
+            else:
+                glEnable(GL_TEXTURE_2D)
+                glColor3f(1, 1, 1)
+                glBindTexture(GL_TEXTURE_2D, textures[feed])
+
+        variants = {
+            # Per-pixel regions as in verynear, compiled per-quad layers as in
+            # tryearrrt, per-feed bind+draw batches as in multicam
+            "angular": AngularFeedProgram(shader_regions(make_layout("cap_front", videos)), flip_v=True),
+            "slices": FeedArrayProgram(flip_v=True),
+            "batches": None,
+        }
+        for slices, stacks in lod_levels:
+            for variant, program in variants.items():
+                mesh = DomeMesh(dome_radius, slices, stacks)
+                if variant == "slices":
+                    compile_layout(mesh, make_layout("quarter_slices", videos), "quarter_slices")
+                elif variant == "batches":
+                    compiled = compile_layout(mesh, make_layout("cap_front", videos, mapping="quad"),
+                                              "cap_front")
+
+                def draw():
+                    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                    if program is None:
+                        draw_batches(mesh, compiled, bind)
+                        glDisable(GL_TEXTURE_2D)
+                        return
+                    program.use(feed_array)
+                    mesh.draw()
+                    program.release()
+                timing = measure(draw, p["iterations"])
+                mesh.delete()
+                results.append(result("draw_textured_dome", {"layout": variant, "feeds": 1 + videos,
+                                                             "mesh": f"{slices}x{stacks}"}, timing))
+        glDeleteTextures(textures)
+        feed_array.delete()
+    return results
+
+def bench_generate_parabolic_trajectory(p):
+    from dome_replay import TrajectorySpawner
+    from dome_spatial import GridIndex, SectorIndex
+    from dome_trajectories import TrajectoryStore, evaluate_trajectories
+    results = []
+    for count in p["trajectory_batches"]:
+        for segments in (12, 50):
+            store = TrajectoryStore()
+            indexes = [GridIndex(store.dome_hits), SectorIndex(store.dome_hits)]
+            spawner = TrajectorySpawner(dome_radius, seed=0)
+
+            def generate():
+                batch = evaluate_trajectories(*spawner.spawn(count), dome_radius, segments)
+                store.add_batch(batch)
+                for index in indexes:
+                    index.update()
+            timing = measure(generate, p["iterations"], finish=False)
+            results.append(result("generate_parabolic_trajectory",
+                                   {"count": count, "segments": segments}, timing))
+    return results
+
+def bench_draw_trajectories(p):
+    from OpenGL.GL import GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, glClear
+    from dome_replay import TrajectorySpawner
+    from dome_trajectories import TrajectoryStore, evaluate_trajectories
+    from dome_trajectory_gl import TrajectoryRenderer
+    results = []
+    for stored in p["stored_trajectories"]:
+        spawner = TrajectorySpawner(dome_radius, seed=0)
+        store = TrajectoryStore()
+        store.add_batch(evaluate_trajectories(*spawner.spawn(stored), dome_radius, 50))
+        renderer = TrajectoryRenderer(store)
+
+        def draw():
+            # One new trajectory per frame, as the viewer spawns them
+            store.add_batch(evaluate_trajectories(*spawner.spawn(1), dome_radius, 50))
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            renderer.draw()
+        timing = measure(draw, p["iterations"])
+        renderer.delete()
+        results.append(result("draw_trajectories", {"stored": stored}, timing))
+    return results
+
+benches = {
+    "load_texture": bench_load_texture,
+    "draw_textured_dome": bench_draw_textured_dome,
+    "generate_parabolic_trajectory": bench_generate_parabolic_trajectory,
+    "draw_trajectories": bench_draw_trajectories,
+}
+
+# -------------------------------
+# Setup, output and comparison
+# -------------------------------
+def setup_view():
+    from OpenGL.GL import (GL_DEPTH_TEST, GL_MODELVIEW, GL_PROJECTION, glEnable,
+                           glLoadIdentity, glMatrixMode, glViewport)
+    from OpenGL.GLU import gluLookAt, gluPerspective
+    glViewport(0, 0, *viewport)
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(45, viewport[0] / viewport[1], 0.1, 3000.0)
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    gluLookAt(0, dome_radius / 2, 1000, 0, dome_radius / 2, 0, 0, 1, 0)
+
+def case_key(entry):
+    return entry["bench"] + " " + " ".join(f"{k}={v}" for k, v in sorted(entry["params"].items()))
+
+def compare(baseline, results):
+    # Prints current/baseline median ratios; > 1 is slower than the baseline
+    old = {case_key(entry): entry for entry in baseline["results"]}
+    lines = []
+    for entry in results:
+        before = old.get(case_key(entry))
+        if before is None:
+            continue
+        ratio = entry["median_ms"] / before["median_ms"] if before["median_ms"] > 0 else math.inf
+        lines.append(f"{case_key(entry):<80} {before['median_ms']:>9.3f} {entry['median_ms']:>9.3f} {ratio:>6.2f}x")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Dome benchmark suite (offscreen, software GL)")
+    parser.add_argument("--platform", choices=platforms, default="osmesa")
+    parser.add_argument("--only", nargs="+", choices=list(benches), help="run only these benchmarks")
+    parser.add_argument("--quick", action="store_true", help="fewer cases and iterations")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    select_platform(args.platform)
+    context = OffscreenContext(args.platform, *viewport)
+    setup_view()
+    params = quick_params if args.quick else full_params
+    results = []
+    for name in args.only or list(benches):
+        print(f"running {name}...", file=sys.stderr)
+        results.extend(benches[name](params))
+    document = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "gl": context.info(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    context.destroy()
+
+    text = json.dumps(document, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"{'case':<80} {'base ms':>9} {'now ms':>9} {'ratio':>7}", file=sys.stderr)
+        for line in compare(baseline, results):
+            print(line, file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
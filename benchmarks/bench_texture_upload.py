@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pygame
+from pygame.locals import *
+from OpenGL.GL import *
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dome_textures import upload_strategies
+
+# -------------------------------
+# Upload time per frame: full glTexImage2D every frame vs each strategy in
+# dome_textures.upload_strategies, at 720p and 1080p
+# -------------------------------
+resolutions = {"720p": (1280, 720), "1080p": (1920, 1080)}
+frames_per_run = 120
+
+def upload_full(frame, texture_id):
+    # The original load_texture() path: parameters and storage every frame
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, frame.shape[1], frame.shape[0],
+                 0, GL_RGB, GL_UNSIGNED_BYTE, frame)
+
+def time_uploads(upload, frames):
+    # Returns (cpu_ms, total_ms) per frame: time spent in the upload call, and
+    # wall time until the GPU has consumed every upload of the run
+    upload(frames[0])  # warm-up, includes first allocation
+    glFinish()
+    cpu = 0.0
+    start = time.perf_counter()
+    for i in range(frames_per_run):
+        t0 = time.perf_counter()
+        upload(frames[i % len(frames)])
+        cpu += time.perf_counter() - t0
+    glFinish()
+    total = time.perf_counter() - start
+    return cpu / frames_per_run * 1000.0, total / frames_per_run * 1000.0
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((64, 64), DOUBLEBUF | OPENGL | HIDDEN)
+    rng = np.random.default_rng(0)
+    print(f"{'resolution':<10} {'strategy':<10} {'cpu ms':>8} {'total ms':>9}")
+    for label, (width, height) in resolutions.items():
+        # A few distinct frames so the driver cannot skip identical uploads
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+        texture_id = glGenTextures(1)
+        cpu_ms, total_ms = time_uploads(lambda f: upload_full(f, texture_id), frames)
+        glDeleteTextures([texture_id])
+        print(f"{label:<10} {'teximage':<10} {cpu_ms:>8.3f} {total_ms:>9.3f}")
+        for strategy, feed_class in upload_strategies.items():
+            feed = feed_class()
+            cpu_ms, total_ms = time_uploads(feed.upload, frames)
+            feed.delete()
+            print(f"{label:<10} {strategy:<10} {cpu_ms:>8.3f} {total_ms:>9.3f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import ctypes
+import os
+
+# -------------------------------
+# Offscreen GL contexts for machines without a GPU or display
+# -------------------------------
+# PyOpenGL picks its platform when OpenGL is first imported, so call
+# select_platform() before importing OpenGL or any dome_* module.
+#   osmesa   Mesa's off-screen rasterizer (libOSMesa), always software
+#   egl      EGL pbuffer on a surfaceless display; with the settings below Mesa
+#            renders through llvmpipe
+#   pygame   a hidden SDL window, for machines that do have a display
+platforms = ("osmesa", "egl", "pygame")
+
+def select_platform(platform):
+    if platform not in platforms:
+        raise ValueError(f"Unknown GL platform: {platform}")
+    if platform in ("osmesa", "egl"):
+        os.environ["PYOPENGL_PLATFORM"] = platform
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+        os.environ.setdefault("GALLIUM_DRIVER", "llvmpipe")
+    if platform == "egl":
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+class OffscreenContext:
+    def __init__(self, platform, width=800, height=600):
+        self.platform = platform
+        self.width = width
+        self.height = height
+        self._handles = None
+        getattr(self, "_create_" + platform)()
+
+    def _create_osmesa(self):
+        from OpenGL import arrays, osmesa
+        from OpenGL.GL import GL_UNSIGNED_BYTE
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not context:
+            raise RuntimeError("OSMesaCreateContextExt failed")
+        buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+        self._handles = (context, buffer)
+
+    def _create_egl(self):
+        from OpenGL import EGL
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("eglInitialize failed")
+        config_attribs = (EGL.EGLint * 15)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_ALPHA_SIZE, 8, EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        if not EGL.eglChooseConfig(display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) \
+                or count.value == 0:
+            raise RuntimeError("No EGL config with a pbuffer and desktop GL")
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, self.width, EGL.EGL_HEIGHT, self.height, EGL.EGL_NONE)
+        surface = EGL.eglCreatePbufferSurface(display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+        if not context or not EGL.eglMakeCurrent(display, surface, surface, context):
+            raise RuntimeError("Could not make an EGL desktop GL context current")
+        self._handles = (display, surface, context)
+
+    def _create_pygame(self):
+        import pygame
+        from pygame.locals import DOUBLEBUF, HIDDEN, OPENGL
+        pygame.init()
+        pygame.display.set_mode((self.width, self.height), DOUBLEBUF | OPENGL | HIDDEN)
+        self._handles = ()
+
+    def info(self):
+        from OpenGL.GL import GL_RENDERER, GL_VENDOR, GL_VERSION, glGetString
+        decode = lambda name: (glGetString(name) or b"").decode(errors="replace")
+        return {"platform": self.platform, "vendor": decode(GL_VENDOR),
+                "renderer": decode(GL_RENDERER), "version": decode(GL_VERSION),
+                "width": self.width, "height": self.height}
+
+    def destroy(self):
+        if self._handles is None:
+            return
+        if self.platform == "osmesa":
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._handles[0])
+        elif self.platform == "egl":
+            from OpenGL import EGL
+            display, surface, context = self._handles
+            EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroySurface(display, surface)
+            EGL.eglDestroyContext(display, context)
+            EGL.eglTerminate(display)
+        else:
+            import pygame
+            pygame.quit()
+        self._handles = None
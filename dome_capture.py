@@ -0,0 +1,313 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from dome_sources import open_source
+
+# -------------------------------
+# Frame reading into reusable buffers
+# -------------------------------
+def read_frame(cap, buf=None, loop=True):
+    # cap.read(buf) decodes into buf when its shape and type already match and
+    # only allocates otherwise; callers compare the result against buf to
+    # count allocations.
+    ret, frame = cap.read(buf) if buf is not None else cap.read()
+    if not ret and loop:
+        # Restart video if it ends; FrameSources rewind themselves
+        if hasattr(cap, "rewind"):
+            cap.rewind()
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        ret, frame = cap.read(buf) if buf is not None else cap.read()
+    return ret, frame
+
+# -------------------------------
+# Background capture: one worker thread per source, latest frame wins
+# -------------------------------
+# convert=True delivers flipped RGB frames; convert=False delivers the decoder's
+# BGR buffer untouched for renderers that upload BGR and flip in texcoords.
+# Frames rotate through a small pool of preallocated buffers, so a published
+# frame stays valid until `buffers - 1` newer ones have been captured.
+class CaptureThread:
+    def __init__(self, cap, name, fps=None, loop=True, convert=True, buffers=3):
+        self.cap = cap
+        self.name = name
+        self.loop = loop
+        self.convert = convert
+        self.frame_format = "rgb" if convert else "bgr"
+        # Files decode faster than real time, so pace them at their own rate;
+        # devices block in read() and need no pacing.
+        self.period = 1.0 / fps if fps else 0.0
+
+        # The slot is a (seq, frame) tuple that the worker replaces whole and
+        # never mutates, so the reader needs no lock to take a consistent pair.
+        self._slot = None
+        self._last_seq = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"capture-{name}", daemon=True)
+        self._pool = [None] * buffers
+        self._next = 0
+        self._decoded = None     # decode target when converting or scaling
+        self._resized = None
+        self._flipped = None
+        # Frames are shrunk by this factor before publishing; the renderer may
+        # change it at any time to trade feed resolution for frame time
+        self.scale = 1.0
+
+        self.frames_captured = 0
+        self.allocations = 0         # frame buffers created; flat after warm-up
+        self.frames_dropped = 0      # produced but overwritten before the renderer took them
+        self.frames_duplicated = 0   # renderer asked again before a new frame arrived
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _buffer(self, buf, shape):
+        # Reuse buf when it matches, otherwise allocate (counted) a new one
+        if buf is None or buf.shape != shape:
+            self.allocations += 1
+            return np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def _capture(self):
+        out = self._pool[self._next]
+        scale = self.scale
+        # Memory-mapped sources hand out views of their frames; take those
+        # instead of copying into our own buffers
+        zero_copy = getattr(self.cap, "zero_copy", False)
+        if not self.convert and scale >= 1.0:
+            if zero_copy:
+                return read_frame(self.cap, None, self.loop)
+            # Copy-free: decode straight into the pool buffer
+            ret, frame = read_frame(self.cap, out, self.loop)
+            if ret and frame is not out:
+                self.allocations += 1
+            return ret, frame
+        ret, frame = read_frame(self.cap, None if zero_copy else self._decoded, self.loop)
+        if not ret:
+            return ret, frame
+        if not zero_copy and frame is not self._decoded:
+            self.allocations += 1
+            self._decoded = frame
+        if scale < 1.0:
+            width = max(1, int(frame.shape[1] * scale))
+            height = max(1, int(frame.shape[0] * scale))
+            if not self.convert:
+                out = self._buffer(out, (height, width, 3))
+                cv2.resize(frame, (width, height), dst=out, interpolation=cv2.INTER_AREA)
+                return ret, out
+            self._resized = self._buffer(self._resized, (height, width, 3))
+            cv2.resize(frame, (width, height), dst=self._resized, interpolation=cv2.INTER_AREA)
+            frame = self._resized
+        self._flipped = self._buffer(self._flipped, frame.shape)
+        out = self._buffer(out, frame.shape)
+        cv2.flip(frame, 0, dst=self._flipped)
+        cv2.cvtColor(self._flipped, cv2.COLOR_BGR2RGB, dst=out)
+        return ret, out
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            ret, frame = self._capture()
+            if not ret:
+                self._stop.wait(0.01)
+                continue
+            self._pool[self._next] = frame
+            self._next = (self._next + 1) % len(self._pool)
+            self.frames_captured += 1
+            self._slot = (self.frames_captured, frame)
+
+            if self.period:
+                next_time += self.period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    next_time = time.perf_counter()  # fell behind, do not try to catch up
+
+    def latest(self):
+        # Returns (frame, is_new) without blocking; frame is None until the
+        # worker has delivered its first frame.
+        slot = self._slot
+        if slot is None:
+            return None, False
+        seq, frame = slot
+        if seq == self._last_seq:
+            self.frames_duplicated += 1
+            return frame, False
+        self.frames_dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        return frame, True
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "duplicated": self.frames_duplicated,
+            "allocations": self.allocations,
+        }
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.cap.release()
+
+
+# -------------------------------
+# Multi-process decode: one process per video writing into a shared-memory ring
+# -------------------------------
+# Ring layout: a small int64 header followed by `slots` preallocated frames
+# (flipped RGB when converting, raw BGR otherwise).
+# header[0] is the sequence number of the newest complete frame and
+# header[1 + k] the sequence number currently stored in slot k, and the last
+# entry counts frame buffers the decoder had to create (flat after warm-up).
+def _ring_views(buf, slots, shape):
+    header = np.ndarray((2 + slots,), dtype=np.int64, buffer=buf)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=buf, offset=header.nbytes)
+    return header, frames
+
+def _ring_nbytes(slots, shape):
+    return 8 * (2 + slots) + slots * int(np.prod(shape))
+
+def _decode_worker(path, shm_name, slots, shape, fps, loop, convert, stop_event):
+    # Several decoders share the machine; keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, frames = _ring_views(shm.buf, slots, shape)
+    height, width = shape[:2]
+    # Every intermediate is preallocated; after the first frame nothing is
+    # created per frame
+    scratch = np.empty(shape, dtype=np.uint8)
+    resized = np.empty(shape, dtype=np.uint8)
+    decoded = None
+    cap = open_source(path)
+    period = 1.0 / fps if fps else 0.0
+    seq = 0
+    next_time = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            slot = (seq + 1) % slots
+            # Mark the slot as being written before touching its pixels
+            header[1 + slot] = 0
+            # BGR frames decode straight into the ring slot while sizes match;
+            # otherwise (and when converting) into one reused decode buffer
+            target = frames[slot] if not convert and decoded is None else decoded
+            ret, frame = read_frame(cap, target, loop)
+            if not ret:
+                stop_event.wait(0.01)
+                continue
+            if frame is not target:
+                header[-1] += 1
+            if convert or frame.shape != shape:
+                decoded = frame  # decode into the same buffer next time
+            if frame.shape != shape:
+                cv2.resize(frame, (width, height), dst=resized)
+                frame = resized
+            if convert:
+                cv2.flip(frame, 0, dst=scratch)
+                cv2.cvtColor(scratch, cv2.COLOR_BGR2RGB, dst=frames[slot])
+            elif frame is not frames[slot]:
+                np.copyto(frames[slot], frame)
+            seq += 1
+            header[1 + slot] = seq
+            header[0] = seq
+
+            if period:
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    stop_event.wait(delay)
+                else:
+                    next_time = time.perf_counter()
+    finally:
+        cap.release()
+        del header, frames
+        shm.close()
+
+class ProcessCapture:
+    # Same interface as CaptureThread, but decoding runs in a separate process.
+    # latest() returns a view straight into shared memory (no copy); with a
+    # paced writer a slot is not reused until `slots - 1` newer frames exist.
+    # path is anything open_source() accepts; the decoder opens its own handle.
+    def __init__(self, path, name, slots=4, fps=None, size=None, loop=True, convert=True):
+        self.path = path
+        self.name = name
+        self.frame_format = "rgb" if convert else "bgr"
+        if size is None or fps is None:
+            probe = open_source(path)
+            if size is None:
+                size = (probe.width or 640, probe.height or 480)
+            if fps is None:
+                fps = probe.fps or 30
+            probe.release()
+        self.shape = (size[1], size[0], 3)
+        self.slots = slots
+
+        self._shm = shared_memory.SharedMemory(create=True, size=_ring_nbytes(slots, self.shape))
+        self._header, self._frames = _ring_views(self._shm.buf, slots, self.shape)
+        self._header[:] = 0
+        # spawn, not fork: decoders start once the window, the GL context and
+        # capture threads exist, and a forked child could inherit a lock held
+        # by one of those threads. The child re-imports the calling script, so
+        # it must not open devices at import time.
+        ctx = multiprocessing.get_context("spawn")
+        self._stop = ctx.Event()
+        self._process = ctx.Process(
+            target=_decode_worker,
+            args=(path, self._shm.name, slots, self.shape, fps, loop, convert, self._stop),
+            name=f"decode-{name}", daemon=True)
+        self._last_seq = 0
+        self._last_frame = None
+
+        self.frames_dropped = 0
+        self.frames_duplicated = 0
+
+    @property
+    def frames_captured(self):
+        return int(self._header[0])
+
+    def start(self):
+        self._process.start()
+        return self
+
+    def latest(self):
+        seq = int(self._header[0])
+        if seq == 0:
+            return None, False
+        if seq == self._last_seq:
+            self.frames_duplicated += 1
+            return self._last_frame, False
+        slot = seq % self.slots
+        if self._header[1 + slot] != seq:
+            # Writer lapped the ring while we looked; keep the previous frame
+            self.frames_duplicated += 1
+            return self._last_frame, False
+        self.frames_dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        self._last_frame = self._frames[slot]
+        return self._last_frame, True
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "duplicated": self.frames_duplicated,
+            "allocations": int(self._header[-1]),
+        }
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._process.is_alive():
+            self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._last_frame = None
+        del self._header, self._frames
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+
+import cv2
+
+from dome_sources import RawFrameSource, RawFrameWriter, VideoFileSource
+
+# -------------------------------
+# Pre-decoded frame cache for looping clips
+# -------------------------------
+# Each clip is decoded once (optionally downscaled to the texture size) into a
+# raw BGR file in the cache directory; later runs memory-map it through
+# RawFrameSource, so playback is a pointer advance and looping needs no seek.
+#
+# Entries are named <clip id>-<version>.raw. The clip id hashes the clip's
+# absolute path and the decode size; the version hashes its size and mtime, or
+# its contents with verify="hash". A changed clip gets a new version and its
+# stale entries are removed. A file's mtime in the cache records its last use,
+# and the least recently used entries are evicted once the directory exceeds
+# budget_bytes.
+#
+# One FrameCache may be shared by several opener threads. Lookups, stale
+# removal and eviction run under a lock; decoding does not, so misses on
+# different clips still decode in parallel. An entry is memory-mapped before
+# the lock is released, so evicting it later cannot pull it from under a
+# source that is already open.
+#
+# A decode in progress is written to <entry>.<pid>-<thread>.partial. Partials
+# count against the budget, and those whose process has exited (killed, or
+# quit mid-decode) are removed on the next open(). close() cancels decodes
+# still running, e.g. ones whose opener missed its deadline, and waits for
+# them to clean up.
+default_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "dome_frames")
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass    # alive, owned by another user
+    return True
+
+class FrameCache:
+    def __init__(self, directory=default_cache_dir, budget_bytes=8 << 30, verify="mtime"):
+        if verify not in ("mtime", "hash"):
+            raise ValueError(f"verify must be 'mtime' or 'hash', got {verify}")
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._decoding = 0
+        self._cancelled = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+
+    def _clip_id(self, path, size):
+        key = f"{os.path.abspath(path)}|{size}"
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def _version(self, path):
+        if self.verify == "hash":
+            digest = hashlib.sha1()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            return digest.hexdigest()[:16]
+        stat = os.stat(path)
+        return hashlib.sha1(f"{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+
+    def entry_path(self, path, size=None):
+        return os.path.join(self.directory, f"{self._clip_id(path, size)}-{self._version(path)}.raw")
+
+    def open(self, path, size=None):
+        # Returns a RawFrameSource for the clip at path, decoding it first on a
+        # miss; size=(width, height) downscales while decoding
+        entry = self.entry_path(path, size)
+        with self._lock:
+            self._remove_orphans()
+            if os.path.exists(entry):
+                self.hits += 1
+                os.utime(entry)    # mark as recently used
+                return RawFrameSource(entry)
+            self.misses += 1
+            self._remove_stale(entry)
+            self._decoding += 1
+        try:
+            partial = self._decode(path, entry, size)
+        finally:
+            with self._lock:
+                self._decoding -= 1
+                self._idle.notify_all()
+        with self._lock:
+            os.replace(partial, entry)
+            source = RawFrameSource(entry)
+            self._evict(keep=entry)
+        return source
+
+    def spec(self, path, size=None):
+        # open_source() spec for the cached clip, e.g. for decode processes;
+        # the entry may be evicted before the spec is opened, so prefer open()
+        source = self.open(path, size)
+        source.release()
+        return "raw:" + source.name
+
+    def close(self, timeout=5.0):
+        # Cancels running decodes (their partials are removed) and waits up to
+        # timeout seconds for them; later misses fail. Returns True when idle.
+        self._cancelled.set()
+        with self._lock:
+            return self._idle.wait_for(lambda: self._decoding == 0, timeout)
+
+    def _remove_stale(self, entry):
+        clip_id = os.path.basename(entry).split("-")[0]
+        for name in os.listdir(self.directory):
+            if name.startswith(clip_id + "-") and name.endswith(".raw"):
+                os.remove(os.path.join(self.directory, name))
+
+    def _remove_orphans(self):
+        for full, _, pid in self.partials():
+            if pid is None or not _pid_alive(pid):
+                try:
+                    os.remove(full)
+                except FileNotFoundError:
+                    pass
+
+    def _decode(self, path, entry, size):
+        source = VideoFileSource(path)
+        if not source.isOpened():
+            raise IOError(f"Could not open video {path}")
+        width, height = size if size else (source.width, source.height)
+        # Written under a temporary name (one per thread, should two threads
+        # miss on the same clip) and renamed by open() when complete, so a
+        # crashed decode never leaves a truncated entry behind
+        partial = f"{entry}.{os.getpid()}-{threading.get_ident()}.partial"
+        writer = RawFrameWriter(partial, width, height, source.fps)
+        try:
+            while True:
+                if self._cancelled.is_set():
+                    raise IOError(f"Decode of {path} cancelled")
+                ret, frame = source.read()
+                if not ret:
+                    break
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+        except BaseException:
+            writer.close()
+            os.remove(partial)
+            raise
+        finally:
+            writer.close()
+            source.release()
+        if writer.frames == 0:
+            os.remove(partial)
+            raise IOError(f"No frames decoded from {path}")
+        return partial
+
+    def entries(self):
+        # [(path, bytes, last_used)] for every complete entry, oldest use first
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".raw"):
+                full = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(full)
+                except FileNotFoundError:
+                    continue    # evicted or replaced since listdir
+                found.append((full, stat.st_size, stat.st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def partials(self):
+        # [(path, bytes, pid)] for decodes in progress or left behind; pid is
+        # None for names that do not carry one
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".partial"):
+                owner = name[:-len(".partial")].rsplit(".", 1)[-1].split("-")[0]
+                full = os.path.join(self.directory, name)
+                try:
+                    size = os.stat(full).st_size
+                except FileNotFoundError:
+                    continue
+                found.append((full, size, int(owner) if owner.isdigit() else None))
+        return found
+
+    def evict(self, keep=None):
+        with self._lock:
+            return self._evict(keep)
+
+    def _evict(self, keep=None):
+        # Partials cannot be evicted, but the space they hold still counts
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries) + sum(size for _, size, _ in self.partials())
+        for full, size, _ in entries:
+            if total <= self.budget_bytes:
+                break
+            if full == keep:
+                continue
+            os.remove(full)
+            total -= size
+        return total
@@ -0,0 +1,83 @@
+import collections
+
+import numpy as np
+
+from dome_trajectories import hemisphere_crossings
+
+# -------------------------------
+# Vectorized interceptor solver
+# -------------------------------
+# A threat launched at launch_time follows its quadratic Bézier with the curve
+# parameter t growing linearly over flight_time seconds. An interceptor fires
+# from `site` reaction_time seconds after `now` and flies straight at `speed`,
+# optionally limited to max_range from the site. An intercept at time tau is
+# feasible when the threat's position at tau is within reach:
+#   |B(t(tau)) - site| <= speed * (tau - fire_time)
+# and tau comes before the threat enters the dome (or lands, if it never does).
+InterceptorModel = collections.namedtuple(
+    "InterceptorModel", ["site", "speed", "reaction_time", "max_range"],
+    defaults=[(0.0, 0.0, 0.0), 600.0, 0.5, None])
+
+#   feasible          (N,)    an intercept exists before the deadline
+#   intercept_time    (N,)    earliest feasible intercept time, NaN if none
+#   intercept_t       (N,)    curve parameter of the threat at that time
+#   intercept_points  (N, 3)  where the interceptor meets the threat
+#   deadline          (N,)    dome entry time (landing time if it never enters)
+InterceptSolution = collections.namedtuple(
+    "InterceptSolution", ["feasible", "intercept_time", "intercept_t", "intercept_points", "deadline"])
+
+def _positions(starts, controls, ends, t):
+    # t is (N, K); returns (N, K, 3)
+    t = t[..., None]
+    return ((1 - t) ** 2 * starts[:, None, :]
+            + 2 * (1 - t) * t * controls[:, None, :]
+            + t ** 2 * ends[:, None, :])
+
+def _reach_gap(starts, controls, ends, launch_times, flight_times, tau, fire_time, model, site):
+    # >= 0 where the interceptor can be at the threat's position at time tau
+    t = np.clip((tau - launch_times[:, None]) / flight_times[:, None], 0.0, 1.0)
+    distance = np.linalg.norm(_positions(starts, controls, ends, t) - site, axis=-1)
+    gap = model.speed * (tau - fire_time) - distance
+    if model.max_range is not None:
+        gap = np.minimum(gap, model.max_range - distance)
+    return gap, t
+
+def solve_intercepts(starts, controls, ends, launch_times, flight_times, now, model, dome_radius,
+                     samples=32, refine=24):
+    count = len(starts)
+    launch_times = np.broadcast_to(np.asarray(launch_times, dtype=float), (count,))
+    flight_times = np.broadcast_to(np.asarray(flight_times, dtype=float), (count,))
+    site = np.asarray(model.site, dtype=float)
+    fire_time = now + model.reaction_time
+
+    entry_t, _ = hemisphere_crossings(starts, controls, ends, dome_radius)
+    deadline = launch_times + np.where(np.isnan(entry_t), 1.0, entry_t) * flight_times
+    earliest = np.maximum(fire_time, launch_times)
+    open_window = deadline > earliest
+
+    # Coarse scan of the window for every threat at once...
+    frac = np.linspace(0.0, 1.0, samples)
+    tau = earliest[:, None] + (deadline - earliest)[:, None] * frac
+    gap, _ = _reach_gap(starts, controls, ends, launch_times, flight_times, tau, fire_time, model, site)
+    reachable = (gap >= 0) & open_window[:, None]
+    feasible = reachable.any(axis=1)
+    first = reachable.argmax(axis=1)
+
+    # ...then bisect between the last unreachable and first reachable sample
+    rows = np.arange(count)
+    hi = tau[rows, first]
+    lo = tau[rows, np.maximum(first - 1, 0)]
+    for _ in range(refine):
+        mid = (lo + hi) / 2
+        mid_gap, _ = _reach_gap(starts, controls, ends, launch_times, flight_times, mid[:, None],
+                                fire_time, model, site)
+        ok = mid_gap[:, 0] >= 0
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    intercept_time = np.where(feasible, hi, np.nan)
+    _, t = _reach_gap(starts, controls, ends, launch_times, flight_times,
+                      np.nan_to_num(intercept_time)[:, None], fire_time, model, site)
+    intercept_t = np.where(feasible, t[:, 0], np.nan)
+    points = _positions(starts, controls, ends, np.nan_to_num(intercept_t)[:, None])[:, 0]
+    points[~feasible] = np.nan
+    return InterceptSolution(feasible, intercept_time, intercept_t, points, deadline)
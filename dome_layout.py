@@ -0,0 +1,113 @@
+import collections
+import math
+
+import numpy as np
+
+# -------------------------------
+# Declarative feed layouts
+# -------------------------------
+# A layout is a list of FeedRegions, first match wins; the rest of the dome is
+# black. theta is measured from the zenith (0 .. pi/2 on the dome) and phi
+# runs counter-clockwise from +x; a phi range may start anywhere and wrap
+# (phi_max - phi_min is the span, at most 2 pi). mapping is how the feed image
+# covers its region:
+#   "stretch"  one image across the whole region
+#   "quad"     the whole image on every mesh quad (the original scripts' look)
+FeedRegion = collections.namedtuple(
+    "FeedRegion", ["feed", "theta_min", "theta_max", "phi_min", "phi_max", "mapping"],
+    defaults=["stretch"])
+
+def cap_and_front(videos, cap_theta=0.3, front_arc=math.pi / 4, mapping="stretch"):
+    # verynear / multicam: webcam (feed 0) on the top cap, the videos split
+    # |phi| <= front_arc below it
+    regions = [FeedRegion(0, 0.0, cap_theta, -math.pi, math.pi, mapping)]
+    segment = 2 * front_arc / videos
+    for idx in range(videos):
+        phi_min = -front_arc + idx * segment
+        regions.append(FeedRegion(1 + idx, cap_theta, math.pi / 2, phi_min, phi_min + segment, mapping))
+    return regions
+
+def quarter_and_rest(videos, mapping="stretch"):
+    # tryearrrt: webcam on the first quarter turn of the dome from +x, the
+    # videos share the remaining three quarters, each stretched over its run
+    regions = [FeedRegion(0, 0.0, math.pi / 2, 0.0, math.pi / 2, mapping)]
+    span = 1.5 * math.pi / videos
+    for idx in range(videos):
+        phi_min = math.pi / 2 + idx * span
+        regions.append(FeedRegion(1 + idx, 0.0, math.pi / 2, phi_min, phi_min + span, mapping))
+    return regions
+
+layouts = {
+    "cap_front": cap_and_front,
+    "quarter_slices": quarter_and_rest,
+}
+
+def make_layout(name, videos, **options):
+    if name not in layouts:
+        raise ValueError(f"Unknown feed layout: {name} (known: {', '.join(layouts)})")
+    return layouts[name](videos, **options)
+
+def shader_regions(regions):
+    # (layer, theta_min, theta_max, phi_min, phi_max) rows for
+    # AngularFeedProgram, which selects per pixel and always stretches
+    return [(r.feed, r.theta_min, r.theta_max, r.phi_min, r.phi_max) for r in regions]
+
+# -------------------------------
+# Compiling a layout for a mesh
+# -------------------------------
+# Every quad is assigned to the first region containing its centre. The mesh's
+# index buffer is reordered so each feed's quads are contiguous, and batches
+# lists (feed, first_quad, quad_count) in that order, feed -1 being the black
+# remainder. Texture-array renderers draw the mesh in one call (the per-vertex
+# layer picks the feed); per-texture renderers bind and draw each batch.
+CompiledLayout = collections.namedtuple("CompiledLayout", ["name", "batches", "quad_feeds"])
+
+def _phi_offset(phi, phi_min):
+    return np.mod(phi - phi_min, 2 * math.pi)
+
+def compile_layout(mesh, regions, name=None):
+    theta0, theta1, phi0, phi1 = mesh.quad_angles()
+    theta_c = (theta0 + theta1) / 2
+    phi_c = (phi0 + phi1) / 2
+    half_dphi = (phi1 - phi0) / 2
+
+    quad_feeds = np.full(mesh.quad_count, -1, dtype=np.int64)
+    texcoords = np.tile(np.array([[0, 0], [0, 1], [1, 1], [1, 0]], dtype=np.float32),
+                        (mesh.quad_count, 1)).reshape(-1, 4, 2)
+    unassigned = np.ones(mesh.quad_count, dtype=bool)
+    for region in regions:
+        span = region.phi_max - region.phi_min
+        offset = _phi_offset(phi_c, region.phi_min)
+        inside = unassigned & (theta_c >= region.theta_min) & (theta_c < region.theta_max)
+        if span < 2 * math.pi:
+            inside &= offset < span
+        quad_feeds[inside] = region.feed
+        unassigned &= ~inside
+        if region.mapping == "stretch":
+            # Measure from the quad centre so quads straddling phi_min do not wrap
+            u0 = (offset[inside] - half_dphi[inside]) / span
+            u1 = (offset[inside] + half_dphi[inside]) / span
+            height = region.theta_max - region.theta_min
+            v0 = (theta0[inside] - region.theta_min) / height
+            v1 = (theta1[inside] - region.theta_min) / height
+            texcoords[inside] = np.stack([np.stack([u0, v0], -1), np.stack([u0, v1], -1),
+                                          np.stack([u1, v1], -1), np.stack([u1, v0], -1)], axis=1)
+        elif region.mapping != "quad":
+            raise ValueError(f"Unknown region mapping: {region.mapping}")
+
+    # Stable sort keeps each feed's quads in stack-major order
+    order = np.argsort(quad_feeds, kind="stable")
+    feeds, first, counts = np.unique(quad_feeds[order], return_index=True, return_counts=True)
+    batches = [(int(f), int(s), int(c)) for f, s, c in zip(feeds, first, counts)]
+
+    mesh.set_quad_layers(quad_feeds)
+    mesh.set_texcoords(texcoords)
+    mesh.set_quad_order(order)
+    mesh.layout = name
+    return CompiledLayout(name, batches, quad_feeds)
+
+def draw_batches(mesh, compiled, bind):
+    # bind(feed) prepares the state for one feed (feed -1: no feed, black)
+    for feed, first, count in compiled.batches:
+        bind(feed)
+        mesh.draw(first, count)
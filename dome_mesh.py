@@ -0,0 +1,172 @@
+import ctypes
+import math
+
+import numpy as np
+from OpenGL.GL import *
+
+from dome_shaders import layer_attribute
+
+# -------------------------------
+# Dome mesh: built once with NumPy, drawn from vertex buffers
+# -------------------------------
+# Each quad of the lat-long grid owns its 4 corners (A, B, C, D as in the old
+# immediate-mode loop) so per-quad attributes such as the feed layer and the
+# texture coordinates can differ between neighbouring quads. Quad q covers
+# vertices 4q..4q+3 and is drawn as two triangles.
+corner_stack = np.array([0, 1, 1, 0])   # A, B, C, D: theta0, theta1, theta1, theta0
+corner_slice = np.array([0, 0, 1, 1])   #             phi0,   phi0,   phi1,   phi1
+
+class DomeMesh:
+    def __init__(self, radius, slices, stacks):
+        self.radius = radius
+        self.slices = slices
+        self.stacks = stacks
+        self.quad_count = slices * stacks
+
+        # Quad grid position in stack-major order, as the old nested loops drew it
+        self.quad_stack = np.repeat(np.arange(stacks), slices)
+        self.quad_slice = np.tile(np.arange(slices), stacks)
+        vertex_stack = self.quad_stack[:, None] + corner_stack
+        vertex_slice = self.quad_slice[:, None] + corner_slice
+        self.theta = (vertex_stack / stacks * (math.pi / 2)).ravel()
+        self.phi = (vertex_slice / slices * (2 * math.pi)).ravel()
+
+        sin_theta = np.sin(self.theta)
+        self.positions = np.empty((4 * self.quad_count, 3), dtype=np.float32)
+        self.positions[:, 0] = radius * sin_theta * np.cos(self.phi)
+        self.positions[:, 1] = radius * np.cos(self.theta)
+        self.positions[:, 2] = radius * sin_theta * np.sin(self.phi)
+
+        # Default: every quad shows its feed's whole image
+        self.texcoords = np.tile(np.array([[0, 0], [0, 1], [1, 1], [1, 0]], dtype=np.float32),
+                                 (self.quad_count, 1))
+        self.layers = np.full(4 * self.quad_count, -1, dtype=np.float32)
+
+        self.set_quad_order(np.arange(self.quad_count))
+
+        self.layout = None    # name of the feed layout applied by the caller
+        self.buffers = None
+        self._dirty = True
+
+    def quad_angles(self):
+        # (theta0, theta1, phi0, phi1) per quad
+        theta = self.theta.reshape(-1, 4)
+        phi = self.phi.reshape(-1, 4)
+        return theta[:, 0], theta[:, 1], phi[:, 0], phi[:, 2]
+
+    def set_quad_layers(self, quad_layers):
+        self.layers[:] = np.repeat(np.asarray(quad_layers, dtype=np.float32), 4)
+        self._dirty = True
+
+    def set_texcoords(self, texcoords):
+        self.texcoords[:] = np.asarray(texcoords, dtype=np.float32).reshape(-1, 2)
+        self._dirty = True
+
+    def set_quad_order(self, order):
+        # Draw order of the quads: draw(first, count) covers order[first:first + count]
+        base = np.asarray(order, dtype=np.uint32)[:, None] * 4
+        self.indices = (base + np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)).ravel()
+        self._dirty = True
+
+    def _upload(self):
+        if self.buffers is None:
+            self.buffers = glGenBuffers(4)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.buffers[3])
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        for buffer, data in zip(self.buffers[:3], (self.positions, self.texcoords, self.layers)):
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._dirty = False
+
+    def draw(self, first=0, count=None):
+        # Draws quads [first, first + count) of the draw order in one
+        # glDrawElements call
+        if self._dirty:
+            self._upload()
+        if count is None:
+            count = self.quad_count - first
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[0])
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[1])
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glTexCoordPointer(2, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[2])
+        glEnableVertexAttribArray(layer_attribute)
+        glVertexAttribPointer(layer_attribute, 1, GL_FLOAT, GL_FALSE, 0, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.buffers[3])
+        glDrawElements(GL_TRIANGLES, 6 * count, GL_UNSIGNED_INT, ctypes.c_void_p(6 * 4 * first))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glDisableVertexAttribArray(layer_attribute)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        if self.buffers is not None:
+            glDeleteBuffers(4, self.buffers)
+        self.buffers = None
+        self._dirty = True
+
+# Meshes are cached by (dome_radius, slices, stacks); the GL buffers are created
+# on first draw, once a context exists
+_mesh_cache = {}
+
+def dome_mesh(radius, slices, stacks):
+    key = (radius, slices, stacks)
+    if key not in _mesh_cache:
+        _mesh_cache[key] = DomeMesh(radius, slices, stacks)
+    return _mesh_cache[key]
+
+# -------------------------------
+# Zoom-dependent level of detail
+# -------------------------------
+# Levels are (slices, stacks) meshes, coarse to fine. The wanted slice count
+# comes from the dome's projected size on screen; a level only changes once the
+# wanted count leaves a +/- hysteresis band around the current level, so the
+# mesh does not flicker while zooming across a boundary.
+lod_levels = [(16, 8), (30, 15), (60, 30), (120, 60), (240, 120)]
+
+class DomeLOD:
+    def __init__(self, radius, levels=lod_levels, pixels_per_slice=10.0, hysteresis=0.25,
+                 fov_y=45.0, viewport_height=600):
+        self.radius = radius
+        self.levels = list(levels)
+        self.pixels_per_slice = pixels_per_slice
+        self.hysteresis = hysteresis
+        self.fov_y = math.radians(fov_y)
+        self.viewport_height = viewport_height
+        # Levels are built the first time they are selected (the finest takes
+        # a noticeable moment), and their GL buffers follow on first draw
+        self.meshes = [None] * len(self.levels)
+        self.level = min(1, len(self.levels) - 1)
+        # Quality governor offset applied on top of the chosen level
+        self.bias = 0
+
+    def projected_diameter(self, zoom_factor, camera_pitch):
+        # The camera orbits (0, radius/2, 0) at 1000 * zoom_factor, as in main();
+        # measure from the dome's base centre so pitch changes the distance too
+        orbit = 1000 * zoom_factor
+        distance = math.sqrt(orbit ** 2 + self.radius * orbit * math.sin(camera_pitch)
+                             + self.radius ** 2 / 4)
+        angle = 2 * math.atan(self.radius / max(distance, 1e-6))
+        return angle / self.fov_y * self.viewport_height
+
+    def wanted_slices(self, zoom_factor, camera_pitch):
+        return math.pi * self.projected_diameter(zoom_factor, camera_pitch) / self.pixels_per_slice
+
+    def select(self, zoom_factor, camera_pitch):
+        wanted = self.wanted_slices(zoom_factor, camera_pitch)
+        slices = [s for s, _ in self.levels]
+        level = self.level
+        while level + 1 < len(slices) and wanted > slices[level] * (1 + self.hysteresis):
+            level += 1
+        while level > 0 and wanted < slices[level - 1] * (1 - self.hysteresis):
+            level -= 1
+        self.level = level
+        chosen = min(max(level + self.bias, 0), len(self.meshes) - 1)
+        if self.meshes[chosen] is None:
+            self.meshes[chosen] = dome_mesh(self.radius, *self.levels[chosen])
+        return self.meshes[chosen]
@@ -0,0 +1,102 @@
+import collections
+import time
+
+# -------------------------------
+# Frame pacing with a quality governor
+# -------------------------------
+# Quality steps, lowest first. feed_scale shrinks captured frames before upload,
+# lod_bias shifts the dome LOD level, trajectory_segments sets how finely new
+# trajectories are sampled.
+quality_levels = [
+    {"feed_scale": 0.5, "lod_bias": -2, "trajectory_segments": 12},
+    {"feed_scale": 0.5, "lod_bias": -1, "trajectory_segments": 25},
+    {"feed_scale": 0.75, "lod_bias": -1, "trajectory_segments": 35},
+    {"feed_scale": 1.0, "lod_bias": 0, "trajectory_segments": 50},
+]
+
+class FrameGovernor:
+    # Call work_done() when the frame's CPU/GL work is submitted (just before
+    # pygame.display.flip()) and end_frame() right after the flip. With vsync
+    # the flip blocks until the swap, so only the time up to work_done() counts
+    # against the budget.
+    def __init__(self, target_fps=30, vsync=False, refresh_rate=60, levels=quality_levels,
+                 on_change=None, window=30, overrun=0.95, headroom=0.6, cooldown=60):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.vsync = vsync
+        self.refresh_period = 1.0 / refresh_rate
+        self.levels = levels
+        self.on_change = on_change
+        self.overrun = overrun        # lower quality when the window mean exceeds this share of the budget
+        self.headroom = headroom      # raise it when the window mean stays below this share
+        self.cooldown = cooldown      # frames to wait after a change before judging again
+        self.level = len(levels) - 1
+        self.work_times = collections.deque(maxlen=window)
+        self.overruns = 0
+        self._since_change = 0
+        self._frame_start = time.perf_counter()
+        self._work_end = None
+
+    def settings(self):
+        return self.levels[self.level]
+
+    def work_done(self):
+        self._work_end = time.perf_counter()
+
+    def end_frame(self):
+        now = time.perf_counter()
+        work_end = self._work_end if self._work_end is not None else now
+        self._work_end = None
+        work = work_end - self._frame_start
+        self.work_times.append(work)
+        if work > self.budget:
+            self.overruns += 1
+        self._govern()
+
+        deadline = self._frame_start + self.budget
+        if self.vsync:
+            # The swap already waited for a vblank; only sleep when the target
+            # rate is below the display rate, aiming half a refresh early so
+            # the next swap lands on the intended vblank
+            deadline -= self.refresh_period / 2
+        self._sleep_until(deadline)
+        end = time.perf_counter()
+        # Late frames restart the schedule instead of trying to catch up
+        self._frame_start = max(self._frame_start + self.budget, end) if not self.vsync else end
+
+    def _sleep_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > 0.002:
+            time.sleep(remaining - 0.001)
+        # Spin the last millisecond; sleep() overshoots by about that much
+        while time.perf_counter() < deadline:
+            pass
+
+    def _govern(self):
+        self._since_change += 1
+        if self._since_change < self.cooldown or len(self.work_times) < self.work_times.maxlen:
+            return
+        mean = sum(self.work_times) / len(self.work_times)
+        if mean > self.budget * self.overrun and self.level > 0:
+            self._set_level(self.level - 1)
+        elif mean < self.budget * self.headroom and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1)
+
+    def _set_level(self, level):
+        self.level = level
+        self._since_change = 0
+        self.work_times.clear()
+        if self.on_change is not None:
+            self.on_change(self.settings())
+
+    def stats(self):
+        times = sorted(self.work_times)
+        if not times:
+            return {"level": self.level, "overruns": self.overruns}
+        return {
+            "level": self.level,
+            "overruns": self.overruns,
+            "mean_ms": sum(times) / len(times) * 1000.0,
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000.0,
+            "budget_ms": self.budget * 1000.0,
+        }
@@ -0,0 +1,131 @@
+import collections
+import json
+import time
+
+import numpy as np
+
+# -------------------------------
+# Per-stage frame timing (no GL)
+# -------------------------------
+# Wrap each stage of the frame in `with profiler.stage("name"):` and call
+# profiler.end_frame() once per frame. While disabled, stage() hands back one
+# shared no-op context manager, so the hot path pays a method call and nothing
+# else. While enabled, every stage keeps a rolling window of durations for
+# percentiles, and the most recent `events` spans are kept in a ring for
+# Chrome trace (chrome://tracing, Perfetto) and CSV export.
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null_stage = _NullStage()
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, time.perf_counter())
+        return False
+
+class FrameProfiler:
+    def __init__(self, enabled=False, window=120, events=65536):
+        self.enabled = enabled
+        self.window = window
+        self.durations = {}                       # stage -> deque of seconds
+        self.frame_times = collections.deque(maxlen=window)
+        self.frames = 0
+        self._stages = {}                         # stage -> reusable _Stage
+        self._names = []                          # stage index -> name for the event ring
+        self._name_index = {}
+        self._event_stage = np.zeros(events, dtype=np.int32)
+        self._event_frame = np.zeros(events, dtype=np.int64)
+        self._event_span = np.zeros((events, 2), dtype=np.float64)
+        self._event_count = 0
+        self._origin = time.perf_counter()
+        self._frame_start = self._origin
+
+    def stage(self, name):
+        if not self.enabled:
+            return _null_stage
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+        return stage
+
+    def _record(self, name, start, end):
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations[name] = collections.deque(maxlen=self.window)
+            self._name_index[name] = len(self._names)
+            self._names.append(name)
+        durations.append(end - start)
+        slot = self._event_count % len(self._event_frame)
+        self._event_stage[slot] = self._name_index[name]
+        self._event_frame[slot] = self.frames
+        self._event_span[slot] = (start, end)
+        self._event_count += 1
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if not self.enabled:
+            # Keep the frame origin current so enabling mid-run starts clean
+            self._frame_start = now
+            return
+        self._record("frame", self._frame_start, now)
+        self.frame_times.append(now - self._frame_start)
+        self._frame_start = now
+        self.frames += 1
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        # {stage: {"p50": ms, ...}} over each stage's rolling window
+        summary = {}
+        for name, durations in self.durations.items():
+            if durations:
+                values = np.percentile(np.fromiter(durations, dtype=np.float64), quantiles) * 1000.0
+                summary[name] = {f"p{q}": float(v) for q, v in zip(quantiles, values)}
+        return summary
+
+    def _events(self):
+        # Recorded spans, oldest first: (stage names, frames, starts, ends) in
+        # seconds relative to the profiler's creation
+        capacity = len(self._event_frame)
+        count = min(self._event_count, capacity)
+        order = (np.arange(count) + max(self._event_count - capacity, 0)) % capacity
+        names = [self._names[i] for i in self._event_stage[order]]
+        spans = self._event_span[order] - self._origin
+        return names, self._event_frame[order], spans[:, 0], spans[:, 1]
+
+    def export_chrome_trace(self, path):
+        names, frames, starts, ends = self._events()
+        events = [{"name": name, "cat": "frame" if name == "frame" else "stage", "ph": "X",
+                   "ts": start * 1e6, "dur": (end - start) * 1e6, "pid": 0,
+                   "tid": 0 if name == "frame" else 1, "args": {"frame": int(frame)}}
+                  for name, frame, start, end in zip(names, frames, starts, ends)]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path):
+        names, frames, starts, ends = self._events()
+        with open(path, "w") as f:
+            f.write("frame,stage,start_ms,duration_ms\n")
+            for name, frame, start, end in zip(names, frames, starts, ends):
+                f.write(f"{frame},{name},{start * 1000.0:.4f},{(end - start) * 1000.0:.4f}\n")
+
+    def hud_lines(self):
+        lines = []
+        if self.frame_times:
+            mean = sum(self.frame_times) / len(self.frame_times)
+            lines.append(f"{1.0 / mean:5.1f} fps")
+        for name, values in self.percentiles().items():
+            lines.append(f"{name:<12} p50 {values['p50']:6.2f}  p95 {values['p95']:6.2f}  p99 {values['p99']:6.2f} ms")
+        return lines
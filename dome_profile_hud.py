@@ -0,0 +1,51 @@
+import pygame
+from OpenGL.GL import *
+
+# -------------------------------
+# On-screen timing overlay
+# -------------------------------
+# Renders FrameProfiler.hud_lines() with a pygame font into an RGBA image and
+# blits it to the window's top-left corner with glDrawPixels. The text is only
+# re-rendered every `refresh` frames; drawing the cached image is one call.
+class ProfilerHUD:
+    def __init__(self, profiler, refresh=15, font_size=16):
+        self.profiler = profiler
+        self.refresh = refresh
+        self.font_size = font_size
+        self.font = None
+        self.image = None
+        self.size = (0, 0)
+        self._frames = 0
+
+    def _render(self):
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", self.font_size)
+        lines = self.profiler.hud_lines() or ["collecting..."]
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(s.get_width() for s in rendered) + 8
+        height = sum(s.get_height() for s in rendered) + 8
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        y = 4
+        for s in rendered:
+            surface.blit(s, (4, y))
+            y += s.get_height()
+        # Flipped: glDrawPixels starts at the bottom row
+        self.image = pygame.image.tostring(surface, "RGBA", True)
+        self.size = (width, height)
+
+    def draw(self, window_height):
+        if self._frames % self.refresh == 0 or self.image is None:
+            self._render()
+        self._frames += 1
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT)
+        glUseProgram(0)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glWindowPos2i(0, window_height - self.size[1])
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glDrawPixels(self.size[0], self.size[1], GL_RGBA, GL_UNSIGNED_BYTE, self.image)
+        glPopAttrib()
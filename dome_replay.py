@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from dome_spatial import GridIndex, SectorIndex
+from dome_trajectories import TrajectoryStore, evaluate_trajectories, random_trajectory_params
+
+# -------------------------------
+# Seeded trajectory spawning
+# -------------------------------
+# One Generator drives both the per-frame spawn decision and the trajectory
+# parameters, so a seed fixes the whole workload. With seed=None the stream is
+# random as before, but the seed that was drawn is kept so the run can still be
+# logged and replayed.
+class TrajectorySpawner:
+    def __init__(self, dome_radius, seed=None, spawn_chance=0.02):
+        self.dome_radius = dome_radius
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.seed = self.seed_sequence.entropy
+        self.spawn_chance = spawn_chance
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+    def spawn(self, count=None):
+        # count=None rolls the per-frame spawn chance; returns (starts,
+        # controls, ends) or None when nothing spawns this frame
+        if count is None:
+            count = 1 if self.rng.random() < self.spawn_chance else 0
+        if count == 0:
+            return None
+        return random_trajectory_params(count, self.dome_radius, self.rng)
+
+# -------------------------------
+# Memory-mapped binary replay log
+# -------------------------------
+# A fixed 64-byte header followed by one 84-byte record per spawned trajectory,
+# in spawn order. The file grows by doubling while recording and is truncated
+# to the records written on close(); readers map it read-only.
+replay_magic = b"DOMELOG1"
+replay_header_dtype = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("flags", "<u4"), ("count", "<u8"),
+    ("dome_radius", "<f8"), ("seed", "S16"), ("reserved", "V16")])
+replay_record_dtype = np.dtype([
+    ("frame", "<u4"), ("time", "<f8"),
+    ("start", "<f8", 3), ("control", "<f8", 3), ("end", "<f8", 3)])
+
+replay_flag_seeded = 1
+
+def _seed_bytes(seed):
+    # SeedSequence entropy is an arbitrary-size int; 128 bits covers the
+    # default draw and any seed passed on a command line
+    return int(seed).to_bytes(16, "little") if seed is not None else bytes(16)
+
+class ReplayWriter:
+    def __init__(self, path, dome_radius, seed=None, capacity=4096):
+        self.path = path
+        self.count = 0
+        self.capacity = capacity
+        self._map(capacity, "w+")
+        self.header["magic"] = replay_magic
+        self.header["version"] = 1
+        self.header["dome_radius"] = dome_radius
+        self.header["seed"] = _seed_bytes(seed)
+        self.header["flags"] = replay_flag_seeded if seed is not None else 0
+
+    def _map(self, capacity, mode):
+        size = replay_header_dtype.itemsize + capacity * replay_record_dtype.itemsize
+        self.header = np.memmap(self.path, dtype=replay_header_dtype, mode=mode, shape=(1,))
+        if mode == "r+":
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+        self.records = np.memmap(self.path, dtype=replay_record_dtype, mode="r+",
+                                 offset=replay_header_dtype.itemsize, shape=(capacity,))
+
+    def append(self, frame, now, starts, controls, ends):
+        count = len(starts)
+        if self.count + count > self.capacity:
+            self.records.flush()
+            capacity = max(self.capacity * 2, self.count + count)
+            del self.records
+            self._map(capacity, "r+")
+            self.capacity = capacity
+        rows = self.records[self.count:self.count + count]
+        rows["frame"] = frame
+        rows["time"] = now
+        rows["start"] = starts
+        rows["control"] = controls
+        rows["end"] = ends
+        self.count += count
+        self.header["count"] = self.count
+
+    def close(self):
+        if self.records is None:
+            return
+        self.records.flush()
+        self.header.flush()
+        self.records = None
+        self.header = None
+        with open(self.path, "r+b") as f:
+            f.truncate(replay_header_dtype.itemsize + self.count * replay_record_dtype.itemsize)
+
+class ReplayLog:
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=replay_header_dtype, count=1)
+        if len(header) == 0 or header[0]["magic"] != replay_magic:
+            raise ValueError(f"{path} is not a dome replay log")
+        self.path = path
+        self.dome_radius = float(header[0]["dome_radius"])
+        seeded = int(header[0]["flags"]) & replay_flag_seeded
+        self.seed = int.from_bytes(header[0]["seed"], "little") if seeded else None
+        count = int(header[0]["count"])
+        self.records = (np.memmap(path, dtype=replay_record_dtype, mode="r",
+                                  offset=replay_header_dtype.itemsize, shape=(count,))
+                        if count else np.empty(0, dtype=replay_record_dtype))
+
+    def __len__(self):
+        return len(self.records)
+
+    def frames(self):
+        # Yields (frame, time, starts, controls, ends) per recorded frame
+        if len(self.records) == 0:
+            return
+        frame_numbers = self.records["frame"]
+        bounds = np.flatnonzero(np.diff(frame_numbers)) + 1
+        for first, last in zip(np.r_[0, bounds], np.r_[bounds, len(self.records)]):
+            rows = self.records[first:last]
+            yield int(rows["frame"][0]), float(rows["time"][0]), rows["start"], rows["control"], rows["end"]
+
+    def frame_batches(self):
+        # {frame: (starts, controls, ends)} for lookups while rendering
+        return {frame: (starts, controls, ends) for frame, _, starts, controls, ends in self.frames()}
+
+# -------------------------------
+# Headless recording and replay
+# -------------------------------
+def record_session(path, frames, dome_radius=300, seed=None, spawn_chance=0.02, fps=30):
+    # The viewer's spawn schedule without a window: one roll per frame at fps
+    spawner = TrajectorySpawner(dome_radius, seed, spawn_chance)
+    writer = ReplayWriter(path, dome_radius, spawner.seed)
+    for frame in range(frames):
+        params = spawner.spawn()
+        if params is not None:
+            writer.append(frame, frame / fps, *params)
+    writer.close()
+    return writer.count
+
+def replay(path, segments=50, store=None):
+    # Feeds every logged trajectory through evaluation, the store and the hit
+    # indexes as fast as possible; returns timings against the recorded duration
+    log = ReplayLog(path)
+    if store is None:
+        store = TrajectoryStore()
+    indexes = [GridIndex(store.dome_hits), SectorIndex(store.dome_hits)]
+    start = time.perf_counter()
+    frames = 0
+    recorded = 0.0
+    for frame, now, starts, controls, ends in log.frames():
+        batch = evaluate_trajectories(np.asarray(starts), np.asarray(controls), np.asarray(ends),
+                                      log.dome_radius, segments)
+        store.add_batch(batch, now)
+        for index in indexes:
+            index.update()
+        frames += 1
+        recorded = now
+    elapsed = time.perf_counter() - start
+    return {
+        "trajectories": len(log),
+        "frames": frames,
+        "recorded_seconds": recorded,
+        "replay_seconds": elapsed,
+        "speedup": recorded / elapsed if elapsed > 0 else None,
+        "seed": log.seed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay dome trajectory logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="write a seeded session without a window")
+    rec.add_argument("path")
+    rec.add_argument("--frames", type=int, default=108000, help="frames to simulate (default: 1 h at 30 fps)")
+    rec.add_argument("--seed", type=int, default=None)
+    rec.add_argument("--dome-radius", type=float, default=300)
+    rec.add_argument("--spawn-chance", type=float, default=0.02)
+    rec.add_argument("--fps", type=float, default=30)
+    rep = sub.add_parser("replay", help="run a log through the engine faster than real time")
+    rep.add_argument("path")
+    rep.add_argument("--segments", type=int, default=50)
+    rep.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        count = record_session(args.path, args.frames, args.dome_radius, args.seed,
+                               args.spawn_chance, args.fps)
+        print(f"{count} trajectories written to {args.path} ({os.path.getsize(args.path)} bytes)")
+        return
+    summary = replay(args.path, args.segments)
+    if args.json:
+        print(json.dumps(summary))
+        return
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import numpy as np
+from OpenGL.GL import *
+
+# -------------------------------
+# Shader helpers
+# -------------------------------
+# Generic attribute 0 aliases glVertex in the compatibility profile, so extra
+# per-vertex attributes are bound to fixed locations starting at 1.
+layer_attribute = 1
+
+def compile_shader(source, shader_type):
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise RuntimeError(f"Shader compile failed: {log.decode() if isinstance(log, bytes) else log}")
+    return shader
+
+def compile_program(vertex_source, fragment_source, attributes=None):
+    program = glCreateProgram()
+    shaders = [compile_shader(vertex_source, GL_VERTEX_SHADER),
+               compile_shader(fragment_source, GL_FRAGMENT_SHADER)]
+    for shader in shaders:
+        glAttachShader(program, shader)
+    for name, location in (attributes or {}).items():
+        glBindAttribLocation(program, location, name)
+    glLinkProgram(program)
+    for shader in shaders:
+        glDetachShader(program, shader)
+        glDeleteShader(shader)
+    if not glGetProgramiv(program, GL_LINK_STATUS):
+        log = glGetProgramInfoLog(program)
+        glDeleteProgram(program)
+        raise RuntimeError(f"Program link failed: {log.decode() if isinstance(log, bytes) else log}")
+    return program
+
+# -------------------------------
+# Dome feeds from a texture array, layer chosen per vertex
+# -------------------------------
+feed_array_vertex_shader = """
+#version 130
+in float layer;          // feed layer in the texture array, negative = no feed
+out vec2 uv;
+flat out int feed;
+void main() {
+    uv = gl_MultiTexCoord0.st;
+    feed = int(layer);
+    gl_FrontColor = gl_Color;
+    gl_Position = gl_ModelViewProjectionMatrix * gl_Vertex;
+}
+"""
+
+feed_array_fragment_shader = """
+#version 130
+uniform sampler2DArray feeds;
+uniform vec2 layer_scale[16];   // part of each layer covered by its current frame
+uniform bool flip_v;            // frames uploaded top row first (unflipped OpenCV buffers)
+in vec2 uv;
+flat in int feed;
+void main() {
+    if (feed < 0) {
+        gl_FragColor = vec4(0.0, 0.0, 0.0, 1.0);
+        return;
+    }
+    vec2 st = flip_v ? vec2(uv.s, 1.0 - uv.t) : uv;
+    gl_FragColor = texture(feeds, vec3(st * layer_scale[feed], float(feed)));
+}
+"""
+
+class FeedArrayProgram:
+    # Compiled lazily: shaders need a current GL context. flip_v does the
+    # vertical flip that cv2.flip(frame, 0) used to do on the CPU.
+    def __init__(self, flip_v=False):
+        self.program = None
+        self.flip_v = flip_v
+
+    def use(self, feed_array):
+        if self.program is None:
+            self.program = compile_program(feed_array_vertex_shader, feed_array_fragment_shader,
+                                           {"layer": layer_attribute})
+            self.feeds_location = glGetUniformLocation(self.program, "feeds")
+            self.scale_location = glGetUniformLocation(self.program, "layer_scale")
+            self.flip_location = glGetUniformLocation(self.program, "flip_v")
+        glUseProgram(self.program)
+        glActiveTexture(GL_TEXTURE0)
+        feed_array.bind()
+        glUniform1i(self.feeds_location, 0)
+        glUniform2fv(self.scale_location, len(feed_array.layer_scales()), feed_array.layer_scales())
+        glUniform1i(self.flip_location, int(self.flip_v))
+
+    def release(self):
+        glUseProgram(0)
+
+# -------------------------------
+# Dome feeds chosen per pixel from a table of angular regions
+# -------------------------------
+# Each region is (layer, theta_min, theta_max, phi_min, phi_max) with theta
+# measured from the zenith; phi runs from phi_min to phi_max and may wrap past
+# pi (phi_max - phi_min is the span, at most 2 pi, as in dome_layout). The
+# first region containing the pixel wins and its feed is stretched across the
+# region. Pixels outside every region are black. The table lives in uniforms
+# and is only re-sent when it changes.
+max_feed_regions = 16
+
+angular_feed_vertex_shader = """
+#version 130
+out vec3 position;
+void main() {
+    position = gl_Vertex.xyz;
+    gl_Position = gl_ModelViewProjectionMatrix * gl_Vertex;
+}
+"""
+
+angular_feed_fragment_shader = """
+#version 130
+uniform sampler2DArray feeds;
+uniform vec2 layer_scale[16];
+uniform bool flip_v;
+uniform int region_count;
+uniform vec4 region_bounds[16];   // theta_min, theta_max, phi_min, phi_max
+uniform int region_layer[16];
+in vec3 position;
+void main() {
+    float theta = acos(clamp(position.y / length(position), -1.0, 1.0));
+    float phi = atan(position.z, position.x);
+    for (int i = 0; i < region_count; ++i) {
+        vec4 b = region_bounds[i];
+        float offset = mod(phi - b.z, 6.28318530718);
+        if (theta >= b.x && theta < b.y && offset <= b.w - b.z) {
+            vec2 st = vec2(offset / (b.w - b.z), (theta - b.x) / (b.y - b.x));
+            if (flip_v) {
+                st.t = 1.0 - st.t;
+            }
+            int layer = region_layer[i];
+            gl_FragColor = texture(feeds, vec3(st * layer_scale[layer], float(layer)));
+            return;
+        }
+    }
+    gl_FragColor = vec4(0.0, 0.0, 0.0, 1.0);
+}
+"""
+
+class AngularFeedProgram:
+    def __init__(self, regions=(), flip_v=False):
+        self.program = None
+        self.flip_v = flip_v
+        self.set_regions(regions)
+
+    def set_regions(self, regions):
+        if len(regions) > max_feed_regions:
+            raise ValueError(f"At most {max_feed_regions} feed regions are supported, got {len(regions)}")
+        self.region_count = len(regions)
+        self.region_layers = np.zeros(max_feed_regions, dtype=np.int32)
+        self.region_bounds = np.zeros((max_feed_regions, 4), dtype=np.float32)
+        for i, (layer, theta_min, theta_max, phi_min, phi_max) in enumerate(regions):
+            self.region_layers[i] = layer
+            self.region_bounds[i] = (theta_min, theta_max, phi_min, phi_max)
+        self._regions_dirty = True
+
+    def use(self, feed_array):
+        if self.program is None:
+            self.program = compile_program(angular_feed_vertex_shader, angular_feed_fragment_shader)
+            self.locations = {name: glGetUniformLocation(self.program, name)
+                              for name in ("feeds", "layer_scale", "flip_v", "region_count",
+                                           "region_bounds", "region_layer")}
+            self._regions_dirty = True
+        glUseProgram(self.program)
+        glActiveTexture(GL_TEXTURE0)
+        feed_array.bind()
+        glUniform1i(self.locations["feeds"], 0)
+        glUniform2fv(self.locations["layer_scale"], len(feed_array.layer_scales()), feed_array.layer_scales())
+        if self._regions_dirty:
+            glUniform1i(self.locations["flip_v"], int(self.flip_v))
+            glUniform1i(self.locations["region_count"], self.region_count)
+            glUniform4fv(self.locations["region_bounds"], max_feed_regions, self.region_bounds)
+            glUniform1iv(self.locations["region_layer"], max_feed_regions, self.region_layers)
+            self._regions_dirty = False
+
+    def release(self):
+        glUseProgram(0)
@@ -0,0 +1,144 @@
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dome_intercept import InterceptorModel, solve_intercepts
+from dome_trajectories import bezier_at, hemisphere_crossings, random_trajectory_params
+
+# -------------------------------
+# Headless threat simulation: no display, capture or GL
+# -------------------------------
+# Threats are generated and intersected with the dome in chunks using the same
+# trajectory code as the renderer, and only aggregate statistics are kept:
+#   entered     trajectory crosses into the dome
+#   penetrated  entered and reached the base without leaving again
+#   exited      entered and left the dome again
+#   intercepted an interceptor reaches the threat before dome entry (only
+#               when an InterceptorModel is given; all threats launch at
+#               t = 0 and take flight_time seconds)
+# Entry points are also binned by their polar angle from the zenith.
+entry_theta_bins = 9    # 10° bins from the zenith down to the rim
+
+def empty_stats():
+    return {
+        "threats": 0,
+        "entered": 0,
+        "penetrated": 0,
+        "exited": 0,
+        "intercepted": 0,
+        "entry_height_sum": 0.0,
+        "entry_height_min": math.inf,
+        "entry_height_max": -math.inf,
+        "entry_theta_hist": [0] * entry_theta_bins,
+    }
+
+def simulate_chunk(count, dome_radius, rng, stats, interceptor=None, flight_time=10.0):
+    starts, controls, ends = random_trajectory_params(count, dome_radius, rng)
+    entry_t, exit_t = hemisphere_crossings(starts, controls, ends, dome_radius)
+    entered = ~np.isnan(entry_t)
+    entries = bezier_at(starts[entered], controls[entered], ends[entered], entry_t[entered])
+    exited = int((~np.isnan(exit_t)).sum())
+
+    stats["threats"] += count
+    stats["entered"] += int(entered.sum())
+    stats["exited"] += exited
+    stats["penetrated"] += int(entered.sum()) - exited
+    if interceptor is not None:
+        solution = solve_intercepts(starts, controls, ends, 0.0, flight_time, 0.0, interceptor, dome_radius)
+        stats["intercepted"] += int(solution.feasible.sum())
+    if len(entries):
+        heights = entries[:, 1]
+        stats["entry_height_sum"] += float(heights.sum())
+        stats["entry_height_min"] = min(stats["entry_height_min"], float(heights.min()))
+        stats["entry_height_max"] = max(stats["entry_height_max"], float(heights.max()))
+        theta = np.arccos(np.clip(heights / dome_radius, -1.0, 1.0))
+        bins = np.minimum((theta / (math.pi / 2) * entry_theta_bins).astype(int), entry_theta_bins - 1)
+        hist = np.bincount(bins, minlength=entry_theta_bins)
+        stats["entry_theta_hist"] = [a + int(b) for a, b in zip(stats["entry_theta_hist"], hist)]
+    return stats
+
+def merge_stats(total, part):
+    for key in ("threats", "entered", "penetrated", "exited", "intercepted", "entry_height_sum"):
+        total[key] += part[key]
+    total["entry_height_min"] = min(total["entry_height_min"], part["entry_height_min"])
+    total["entry_height_max"] = max(total["entry_height_max"], part["entry_height_max"])
+    total["entry_theta_hist"] = [a + b for a, b in zip(total["entry_theta_hist"], part["entry_theta_hist"])]
+    return total
+
+def run_worker(count, dome_radius, chunk, seed, interceptor=None, flight_time=10.0):
+    # seed is a SeedSequence (or int); each worker owns an independent stream
+    rng = np.random.default_rng(seed)
+    stats = empty_stats()
+    remaining = count
+    while remaining > 0:
+        n = min(chunk, remaining)
+        simulate_chunk(n, dome_radius, rng, stats, interceptor, flight_time)
+        remaining -= n
+    return stats
+
+def run_simulation(threats, dome_radius=300, chunk=100000, workers=1, seed=None,
+                   interceptor=None, flight_time=10.0):
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [threats // workers + (1 if i < threats % workers else 0) for i in range(workers)]
+    if workers == 1:
+        return run_worker(shares[0], dome_radius, chunk, seeds[0], interceptor, flight_time)
+    total = empty_stats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_worker, share, dome_radius, chunk, s, interceptor, flight_time)
+                   for share, s in zip(shares, seeds)]
+        for future in futures:
+            merge_stats(total, future.result())
+    return total
+
+def summarize(stats, elapsed):
+    threats = max(stats["threats"], 1)
+    entered = max(stats["entered"], 1)
+    return {
+        "threats": stats["threats"],
+        "entered": stats["entered"],
+        "penetrated": stats["penetrated"],
+        "exited": stats["exited"],
+        "intercepted": stats["intercepted"],
+        "hit_rate": stats["entered"] / threats,
+        "penetration_rate": stats["penetrated"] / threats,
+        "mean_entry_height": stats["entry_height_sum"] / entered if stats["entered"] else None,
+        "entry_height_min": stats["entry_height_min"] if stats["entered"] else None,
+        "entry_height_max": stats["entry_height_max"] if stats["entered"] else None,
+        "entry_theta_hist": stats["entry_theta_hist"],
+        "seconds": elapsed,
+        "threats_per_second": stats["threats"] / elapsed if elapsed > 0 else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless dome threat simulation")
+    parser.add_argument("--threats", type=int, default=1000000)
+    parser.add_argument("--dome-radius", type=float, default=300)
+    parser.add_argument("--chunk", type=int, default=100000, help="threats evaluated per vectorized batch")
+    parser.add_argument("--workers", type=int, default=1, help="processes; each gets its own seed stream")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--interceptor-speed", type=float, default=None,
+                        help="also solve intercepts for interceptors of this speed (units/s)")
+    parser.add_argument("--reaction-time", type=float, default=0.5)
+    parser.add_argument("--flight-time", type=float, default=10.0, help="threat flight time in seconds")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    interceptor = None
+    if args.interceptor_speed is not None:
+        interceptor = InterceptorModel(speed=args.interceptor_speed, reaction_time=args.reaction_time)
+    start = time.perf_counter()
+    stats = run_simulation(args.threats, args.dome_radius, args.chunk, args.workers, args.seed,
+                           interceptor, args.flight_time)
+    summary = summarize(stats, time.perf_counter() - start)
+    if args.json:
+        print(json.dumps(summary))
+        return
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+# -------------------------------
+# Frame sources
+# -------------------------------
+# Every backend reads like cv2.VideoCapture, so CaptureThread, read_frame() and
+# the decode processes take any of them:
+#   read(buf=None) -> (ok, frame)  frame is a uint8 (height, width, 3) BGR image,
+#                                  decoded into buf when buf fits
+#   rewind()                       back to the first frame (no-op for devices)
+#   isOpened(), release()
+# and reports what it delivers:
+#   width, height, fps             native resolution and frame rate
+#   is_live                        a device that paces itself; files are paced
+#                                  by the reader at fps
+#   frame_index, timestamp         index and time (seconds) of the last frame
+#                                  read: media time for files, capture time
+#                                  (time.monotonic()) for devices
+#   zero_copy                      read() without a buffer returns read-only
+#                                  views that stay valid; readers should not
+#                                  pass one
+class FrameSource:
+    is_live = False
+    zero_copy = False
+
+    def __init__(self, name):
+        self.name = name
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.frame_count = None    # None when unknown or endless
+        self.frame_index = -1
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.width > 0
+
+    def read(self, buf=None):
+        raise NotImplementedError
+
+    def rewind(self):
+        pass
+
+    def release(self):
+        pass
+
+    def info(self):
+        return {"name": self.name, "backend": type(self).__name__, "width": self.width,
+                "height": self.height, "fps": self.fps, "live": self.is_live,
+                "frames": self.frame_count}
+
+    def _advance(self, timestamp=None):
+        self.frame_index += 1
+        self.timestamp = timestamp if timestamp is not None else \
+            self.frame_index / self.fps if self.fps else 0.0
+
+def _into(buf, frame):
+    # Copy into the caller's buffer when it fits, like cap.read(buf) does
+    if buf is not None and buf.shape == frame.shape and buf.dtype == frame.dtype and buf.flags.writeable:
+        np.copyto(buf, frame)
+        return buf
+    return frame
+
+# -------------------------------
+# OpenCV-backed sources: V4L2 devices and video files
+# -------------------------------
+class _CaptureSource(FrameSource):
+    def __init__(self, name, cap):
+        super().__init__(name)
+        self.cap = cap
+        if cap.isOpened():
+            self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+class DeviceSource(_CaptureSource):
+    is_live = True
+
+    def __init__(self, device=0, width=None, height=None, fps=None, fourcc=None):
+        # device is an index or a /dev/video* path; requested settings are
+        # hints, the attributes report what the driver granted
+        cap = cv2.VideoCapture(device, cv2.CAP_V4L2)
+        if not cap.isOpened():
+            cap = cv2.VideoCapture(device)    # non-V4L2 builds and platforms
+        if fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            cap.set(cv2.CAP_PROP_FPS, fps)
+        super().__init__(f"device:{device}", cap)
+
+    def read(self, buf=None):
+        ret, frame = self.cap.read(buf) if buf is not None else self.cap.read()
+        if ret:
+            self._advance(time.monotonic())
+        return ret, frame
+
+class VideoFileSource(_CaptureSource):
+    def __init__(self, path):
+        super().__init__(path, cv2.VideoCapture(path))
+        if self.cap.isOpened():
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+
+    def read(self, buf=None):
+        ret, frame = self.cap.read(buf) if buf is not None else self.cap.read()
+        if ret:
+            # POS_MSEC is the media time of the next frame on some backends
+            # and 0 on others; the frame index is reliable
+            self._advance()
+        return ret, frame
+
+    def rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.frame_index = -1
+
+# -------------------------------
+# Image sequences
+# -------------------------------
+class ImageSequenceSource(FrameSource):
+    def __init__(self, pattern, fps=30.0):
+        # pattern is a glob ("shots/*.png") or a directory of images
+        super().__init__(pattern)
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        extensions = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+        self.paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(extensions))
+        self.fps = fps
+        self.frame_count = len(self.paths)
+        if self.paths:
+            first = cv2.imread(self.paths[0], cv2.IMREAD_COLOR)
+            if first is not None:
+                self.height, self.width = first.shape[:2]
+
+    def read(self, buf=None):
+        if self.frame_index + 1 >= len(self.paths):
+            return False, None
+        frame = cv2.imread(self.paths[self.frame_index + 1], cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        self._advance()
+        return True, _into(buf, frame)
+
+    def rewind(self):
+        self.frame_index = -1
+
+# -------------------------------
+# Procedural test pattern
+# -------------------------------
+class TestPatternSource(FrameSource):
+    # Colour bars scrolling one bar width per second with a frame-index stripe
+    # at the bottom; decoding costs one memory copy. frames=None never ends.
+    palette = np.array([[255, 255, 255], [0, 255, 255], [255, 255, 0], [0, 255, 0],
+                        [255, 0, 255], [0, 0, 255], [255, 0, 0], [0, 0, 0]], dtype=np.uint8)
+
+    def __init__(self, width=640, height=480, fps=30.0, frames=None):
+        super().__init__(f"pattern:{width}x{height}@{fps:g}")
+        self.width, self.height, self.fps = width, height, fps
+        self.frame_count = frames
+        # Twice as wide as a frame, so each frame is one slice of it
+        bars = np.arange(2 * width) * 8 // width % 8
+        self._strip = np.ascontiguousarray(self.palette[bars][None].repeat(height, axis=0))
+        self._step = max(1, int(round(width / 8 / fps)))
+
+    def read(self, buf=None):
+        if self.frame_count is not None and self.frame_index + 1 >= self.frame_count:
+            return False, None
+        index = self.frame_index + 1
+        offset = index * self._step % self.width
+        if buf is None or buf.shape != (self.height, self.width, 3):
+            buf = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        np.copyto(buf, self._strip[:, offset:offset + self.width])
+        # 16 binary cells of the frame index along the bottom edge
+        stripe = max(1, self.height // 32)
+        bits = (index >> np.arange(16)) & 1
+        cells = np.repeat(bits * 255, -(-self.width // 16))[:self.width].astype(np.uint8)
+        buf[-stripe:] = cells[None, :, None]
+        self._advance()
+        return True, buf
+
+    def rewind(self):
+        self.frame_index = -1
+
+# -------------------------------
+# Placeholder for a feed that could not be opened
+# -------------------------------
+class PlaceholderSource(FrameSource):
+    # A dark checkerboard with a red diagonal cross, delivered once a second
+    def __init__(self, name, width=320, height=240):
+        super().__init__(name)
+        self.width, self.height, self.fps = width, height, 1.0
+        y, x = np.mgrid[:height, :width]
+        frame = np.where(((x // 20 + y // 20) % 2)[..., None] == 0, 40, 70).astype(np.uint8).repeat(3, axis=2)
+        cross = (np.abs(x * height - y * width) < 2 * width) | (np.abs((width - x) * height - y * width) < 2 * width)
+        frame[cross] = (0, 0, 200)    # BGR
+        self.frame = frame
+
+    def read(self, buf=None):
+        self._advance()
+        return True, _into(buf, self.frame)
+
+# -------------------------------
+# Pre-decoded raw frames, memory-mapped
+# -------------------------------
+# A 64-byte header, then `frames` tightly packed (height, width, 3) uint8
+# images. read() without a buffer returns a view into the map, so playback is
+# a pointer advance and the page cache is the only copy.
+raw_magic = b"DOMERAW1"
+raw_header_dtype = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("width", "<u4"), ("height", "<u4"),
+    ("channels", "<u4"), ("frames", "<u8"), ("fps", "<f8"), ("pixel_format", "S4"),
+    ("reserved", "V20")])
+
+class RawFrameWriter:
+    # Frames are appended in order; the header's frame count is written last,
+    # so a file cut short reads back as the frames completed
+    def __init__(self, path, width, height, fps, pixel_format="bgr"):
+        self.path = path
+        self.shape = (height, width, 3)
+        self.frames = 0
+        self.file = open(path, "wb")
+        self.header = np.zeros(1, dtype=raw_header_dtype)
+        self.header["magic"] = raw_magic
+        self.header["version"] = 1
+        self.header[["width", "height", "channels"]] = (width, height, 3)
+        self.header["fps"] = fps
+        self.header["pixel_format"] = pixel_format.encode()
+        self.file.write(self.header.tobytes())
+
+    def write(self, frame):
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match {self.shape}")
+        self.file.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        self.frames += 1
+
+    def close(self):
+        if self.file is None:
+            return
+        self.header["frames"] = self.frames
+        self.file.seek(0)
+        self.file.write(self.header.tobytes())
+        self.file.close()
+        self.file = None
+
+def read_raw_header(path):
+    header = np.fromfile(path, dtype=raw_header_dtype, count=1)
+    if len(header) == 0 or header[0]["magic"] != raw_magic:
+        raise ValueError(f"{path} is not a raw frame file")
+    return header[0]
+
+class RawFrameSource(FrameSource):
+    zero_copy = True
+
+    def __init__(self, path):
+        super().__init__(path)
+        header = read_raw_header(path)
+        self.width, self.height = int(header["width"]), int(header["height"])
+        self.fps = float(header["fps"])
+        self.pixel_format = header["pixel_format"].decode()
+        self.frame_count = int(header["frames"])
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=raw_header_dtype.itemsize,
+                                shape=(self.frame_count, self.height, self.width, 3)) \
+            if self.frame_count else None
+
+    def isOpened(self):
+        return self.frames is not None
+
+    def read(self, buf=None):
+        if self.frames is None or self.frame_index + 1 >= self.frame_count:
+            return False, None
+        self._advance()
+        return True, _into(buf, self.frames[self.frame_index])
+
+    def rewind(self):
+        self.frame_index = -1
+
+    def release(self):
+        self.frames = None
+
+# -------------------------------
+# Source specs
+# -------------------------------
+#   0, "device:0", "v4l2:/dev/video2"       DeviceSource
+#   "file:clip.mp4" or a video path         VideoFileSource
+#   "images:shots/*.png" or a directory     ImageSequenceSource (30 fps)
+#   "pattern:1280x720@30", "pattern"        TestPatternSource
+#   "raw:clip.raw" or a *.raw path          RawFrameSource
+def open_source(spec):
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int):
+        return DeviceSource(spec)
+    kind, _, arg = spec.partition(":")
+    if kind not in ("device", "v4l2", "file", "images", "raw", "pattern") or not _:
+        kind, arg = "", spec
+    if kind in ("device", "v4l2"):
+        return DeviceSource(int(arg) if arg.isdigit() else arg)
+    if kind == "file":
+        return VideoFileSource(arg)
+    if kind == "images":
+        return ImageSequenceSource(arg)
+    if kind == "raw" or (not kind and arg.endswith(".raw")):
+        return RawFrameSource(arg)
+    if kind == "pattern" or spec == "pattern":
+        size, _, fps = arg.partition("@") if kind else ("", "", "")
+        width, _, height = size.partition("x")
+        return TestPatternSource(int(width or 640), int(height or 480), float(fps or 30))
+    if os.path.isdir(arg) or any(ch in arg for ch in "*?["):
+        return ImageSequenceSource(arg)
+    return VideoFileSource(spec)
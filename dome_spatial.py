@@ -0,0 +1,178 @@
+import math
+
+import numpy as np
+
+# -------------------------------
+# Spatial indexes over a PointRing (NumPy only, no GL)
+# -------------------------------
+# Rows are referred to by their append sequence number. A PointRing writes
+# sequence number k to physical row k % capacity and keeps the last `size` of
+# them live, so an index entry is valid while k >= appended - size; overwritten
+# and expired rows simply stop matching, with no removal step.
+#
+# Entries live in two parts: a main array sorted by bucket key, searched with
+# np.searchsorted, and a small unsorted delta of recent rows that is scanned
+# directly. update() pulls newly appended rows into the delta and merges it into
+# the main array (one O(M) insert) once it grows past merge_threshold.
+class _BucketIndex:
+    def __init__(self, ring, merge_threshold=8192):
+        self.ring = ring
+        self.merge_threshold = merge_threshold
+        self.keys = np.empty(0, dtype=np.int64)
+        self.seqs = np.empty(0, dtype=np.int64)
+        self.delta_keys = np.empty(0, dtype=np.int64)
+        self.delta_seqs = np.empty(0, dtype=np.int64)
+        self.synced = 0    # ring.appended at the last update
+
+    def _keys_for(self, points):
+        raise NotImplementedError
+
+    def _oldest_live(self):
+        return self.ring.appended - self.ring.size
+
+    def update(self):
+        ring = self.ring
+        first = max(self.synced, self._oldest_live())
+        if ring.appended > first:
+            seqs = np.arange(first, ring.appended, dtype=np.int64)
+            keys = self._keys_for(ring.data[seqs % ring.capacity, :3])
+            self.delta_keys = np.concatenate([self.delta_keys, keys])
+            self.delta_seqs = np.concatenate([self.delta_seqs, seqs])
+        self.synced = ring.appended
+        if len(self.delta_keys) >= self.merge_threshold:
+            self._merge()
+
+    def _merge(self):
+        keys, seqs = self.keys, self.seqs
+        oldest = self._oldest_live()
+        # Drop dead entries while we are rewriting the arrays anyway
+        if len(seqs) and (seqs < oldest).mean() > 0.25:
+            alive = seqs >= oldest
+            keys, seqs = keys[alive], seqs[alive]
+        live = self.delta_seqs >= oldest
+        order = np.argsort(self.delta_keys[live], kind="stable")
+        new_keys = self.delta_keys[live][order]
+        new_seqs = self.delta_seqs[live][order]
+        at = np.searchsorted(keys, new_keys, side="right")
+        self.keys = np.insert(keys, at, new_keys)
+        self.seqs = np.insert(seqs, at, new_seqs)
+        self.delta_keys = np.empty(0, dtype=np.int64)
+        self.delta_seqs = np.empty(0, dtype=np.int64)
+
+    def _candidates(self, bucket_keys):
+        # Live sequence numbers stored under any of bucket_keys
+        bucket_keys = np.unique(np.asarray(bucket_keys, dtype=np.int64))
+        lo = np.searchsorted(self.keys, bucket_keys, side="left")
+        hi = np.searchsorted(self.keys, bucket_keys, side="right")
+        lengths = hi - lo
+        hits = lengths > 0
+        if hits.any():
+            starts = np.repeat(lo[hits], lengths[hits])
+            offsets = np.arange(lengths[hits].sum()) - np.repeat(np.cumsum(lengths[hits]) - lengths[hits], lengths[hits])
+            seqs = self.seqs[starts + offsets]
+        else:
+            seqs = np.empty(0, dtype=np.int64)
+        if len(self.delta_keys):
+            seqs = np.concatenate([seqs, self.delta_seqs[np.isin(self.delta_keys, bucket_keys)]])
+        return seqs[seqs >= self._oldest_live()]
+
+    def _points(self, seqs):
+        return self.ring.data[seqs % self.ring.capacity, :3]
+
+    def __len__(self):
+        oldest = self._oldest_live()
+        return int((self.seqs >= oldest).sum() + (self.delta_seqs >= oldest).sum())
+
+# -------------------------------
+# Uniform grid: radius and nearest-point queries
+# -------------------------------
+_axis_bits = 20
+_axis_offset = 1 << (_axis_bits - 1)
+
+class GridIndex(_BucketIndex):
+    def __init__(self, ring, cell_size=20.0, merge_threshold=8192):
+        super().__init__(ring, merge_threshold)
+        self.cell_size = cell_size
+
+    def _cells(self, points):
+        return np.floor(np.asarray(points, dtype=np.float64) / self.cell_size).astype(np.int64) + _axis_offset
+
+    def _pack(self, cells):
+        return (cells[..., 0] << (2 * _axis_bits)) | (cells[..., 1] << _axis_bits) | cells[..., 2]
+
+    def _keys_for(self, points):
+        return self._pack(self._cells(points))
+
+    def query_radius(self, center, radius):
+        # Returns (seqs, points) of live rows within radius of center
+        center = np.asarray(center, dtype=np.float64)
+        lo = self._cells(center - radius)
+        hi = self._cells(center + radius)
+        axes = [np.arange(lo[k], hi[k] + 1) for k in range(3)]
+        cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+        seqs = self._candidates(self._pack(cells))
+        points = self._points(seqs)
+        inside = np.einsum("ij,ij->i", points - center, points - center) <= radius * radius
+        return seqs[inside], points[inside]
+
+    def nearest(self, point, max_radius=math.inf):
+        # Grow the search sphere until it holds a point: the closest point
+        # within the sphere is then the closest overall. Returns (seq, point,
+        # distance) or None.
+        point = np.asarray(point, dtype=np.float64)
+        radius = self.cell_size
+        while True:
+            seqs, points = self.query_radius(point, min(radius, max_radius))
+            if len(seqs):
+                distances = np.linalg.norm(points - point, axis=1)
+                best = int(distances.argmin())
+                return int(seqs[best]), points[best], float(distances[best])
+            if radius >= max_radius or len(self) == 0:
+                return None
+            radius *= 2
+
+# -------------------------------
+# Angular bins on the dome surface: sector queries
+# -------------------------------
+# theta is measured from the zenith (0 .. pi/2 on the dome), phi in [-pi, pi).
+def spherical_angles(points):
+    points = np.asarray(points, dtype=np.float64)
+    radius = np.maximum(np.linalg.norm(points, axis=-1), 1e-12)
+    theta = np.arccos(np.clip(points[..., 1] / radius, -1.0, 1.0))
+    phi = np.arctan2(points[..., 2], points[..., 0])
+    return theta, phi
+
+class SectorIndex(_BucketIndex):
+    def __init__(self, ring, theta_bins=45, phi_bins=180, merge_threshold=8192):
+        super().__init__(ring, merge_threshold)
+        self.theta_bins = theta_bins
+        self.phi_bins = phi_bins
+
+    def _bins(self, theta, phi):
+        t = np.clip((theta / (math.pi / 2) * self.theta_bins).astype(np.int64), 0, self.theta_bins - 1)
+        p = np.clip(((phi + math.pi) / (2 * math.pi) * self.phi_bins).astype(np.int64), 0, self.phi_bins - 1)
+        return t, p
+
+    def _keys_for(self, points):
+        t, p = self._bins(*spherical_angles(points))
+        return t * self.phi_bins + p
+
+    def query_sector(self, theta_min, theta_max, phi_min, phi_max):
+        # Returns (seqs, points) of live rows inside the sector; phi_min > phi_max
+        # wraps through +/-pi
+        t0, p0 = self._bins(np.float64(theta_min), np.float64(phi_min))
+        t1, p1 = self._bins(np.float64(theta_max), np.float64(phi_max))
+        t_range = np.arange(t0, t1 + 1)
+        # Decide wrapping from the angles: a wrapped sector can start and end
+        # in the same bin and still cover every other bin
+        if phi_min <= phi_max:
+            p_range = np.arange(p0, p1 + 1)
+        else:
+            p_range = np.concatenate([np.arange(p0, self.phi_bins), np.arange(0, p1 + 1)])
+        keys = (t_range[:, None] * self.phi_bins + p_range[None, :]).ravel()
+        seqs = self._candidates(keys)
+        points = self._points(seqs)
+        theta, phi = spherical_angles(points)
+        in_phi = (phi >= phi_min) & (phi <= phi_max) if phi_min <= phi_max else (phi >= phi_min) | (phi <= phi_max)
+        inside = (theta >= theta_min) & (theta <= theta_max) & in_phi
+        return seqs[inside], points[inside]
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+from dome_sources import PlaceholderSource, open_source
+
+# -------------------------------
+# Startup timing
+# -------------------------------
+# Marks are seconds since the process started (read from /proc where
+# available, so interpreter start-up and imports are included), otherwise
+# since the timer was created.
+def process_uptime():
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        ticks = os.sysconf("SC_CLK_TCK")
+        return max(uptime - int(fields[19]) / ticks, 0.0)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupTimer:
+    def __init__(self):
+        uptime = process_uptime()
+        self.from_process_start = uptime is not None
+        self.origin = time.perf_counter() - (uptime or 0.0)
+        self.marks = {}
+
+    def mark(self, name):
+        # Only the first occurrence of a name counts
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.origin
+        return self.marks[name]
+
+    def report(self):
+        return {"from_process_start": self.from_process_start,
+                "marks_ms": {name: seconds * 1000.0 for name, seconds in self.marks.items()}}
+
+# -------------------------------
+# Parallel source opening with a deadline
+# -------------------------------
+# Each spec opens on its own daemon thread: a device or network stream that
+# hangs in open cannot be cancelled, but it no longer holds up the others or
+# the process exit, and a source that opens after the deadline is released
+# rather than left holding its device. Returns [(source, error, seconds)] in
+# spec order; source is None when opening failed or missed the deadline.
+def open_sources(specs, timeout=5.0, opener=open_source):
+    results = [None] * len(specs)
+    lock = threading.Lock()
+    abandoned = [False]    # set once the deadline has passed
+
+    def open_one(index, spec):
+        start = time.perf_counter()
+        try:
+            source = opener(spec)
+            error = None if source.isOpened() else "could not open"
+        except Exception as exc:    # a bad file must not take down the others
+            source, error = None, str(exc)
+        if error is not None and source is not None:
+            source.release()
+            source = None
+        with lock:
+            if abandoned[0]:
+                if source is not None:
+                    source.release()
+                return
+            results[index] = (source, error, time.perf_counter() - start)
+
+    threads = [threading.Thread(target=open_one, args=(i, spec), name=f"open-{i}", daemon=True)
+               for i, spec in enumerate(specs)]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + timeout
+    for thread in threads:
+        thread.join(max(deadline - time.perf_counter(), 0.0))
+    with lock:
+        abandoned[0] = True
+        return [result if result is not None else (None, f"timed out after {timeout:g} s", timeout)
+                for result in results]
+
+def open_sources_or_placeholders(specs, names, timeout=5.0, opener=open_source):
+    # Like open_sources(), but failed feeds become PlaceholderSources so the
+    # layout keeps its layers; returns (sources, failures)
+    sources, failures = [], {}
+    for spec, name, (source, error, _) in zip(specs, names, open_sources(specs, timeout, opener)):
+        if source is None:
+            failures[name] = error
+            source = PlaceholderSource(name)
+        sources.append(source)
+    return sources, failures
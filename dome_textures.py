@@ -0,0 +1,222 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+# -------------------------------
+# Persistent feed textures: storage allocated once, sub-image updates per frame
+# -------------------------------
+# pixel_format is the layout of the uploaded frames: GL_RGB for converted
+# frames, GL_BGR to upload OpenCV's buffers without a CPU conversion.
+class FeedTexture:
+    def __init__(self, texture_id=None, pixel_format=GL_RGB):
+        self.texture_id = texture_id
+        self.pixel_format = pixel_format
+        self.size = None          # (width, height) of the allocated storage
+        self.reallocations = 0
+
+    def _allocate(self, width, height):
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, None)
+        self.size = (width, height)
+        self.reallocations += 1
+
+    def upload(self, frame):
+        # frame is a uint8 array (height, width, 3); storage is only
+        # reallocated when the source's resolution changes
+        height, width = frame.shape[:2]
+        if self.texture_id is None:
+            self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        if self.size != (width, height):
+            self._allocate(width, height)
+        # Rows of odd-width RGB frames are not 4-byte aligned
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, self.pixel_format, GL_UNSIGNED_BYTE, frame)
+
+    def bind(self):
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+
+    def delete(self):
+        if self.texture_id is not None:
+            glDeleteTextures([self.texture_id])
+        self.texture_id = None
+        self.size = None
+
+
+# -------------------------------
+# Asynchronous upload through two alternating pixel buffer objects
+# -------------------------------
+# Frame N is copied into one mapped PBO while the texture is updated from the
+# other PBO holding frame N-1, so glTexSubImage2D returns without waiting for
+# the driver to read client memory. The picture lags the capture by one frame.
+class PBOFeedTexture(FeedTexture):
+    def __init__(self, texture_id=None, pixel_format=GL_RGB):
+        super().__init__(texture_id, pixel_format)
+        self.pbos = None
+        self.frame_index = 0
+        self.nbytes = 0
+
+    def _allocate(self, width, height):
+        super()._allocate(width, height)
+        if self.pbos is not None:
+            glDeleteBuffers(2, self.pbos)
+        self.nbytes = width * height * 3
+        self.pbos = glGenBuffers(2)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.nbytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.frame_index = 0
+
+    def _write_pbo(self, pbo, frame):
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        # Orphan the old store so mapping never waits on a transfer in flight
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, self.nbytes, None, GL_STREAM_DRAW)
+        ptr = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+        if ptr:
+            ctypes.memmove(ptr, np.ascontiguousarray(frame).ctypes.data, self.nbytes)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+
+    def upload(self, frame):
+        height, width = frame.shape[:2]
+        if self.texture_id is None:
+            self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        if self.size != (width, height):
+            self._allocate(width, height)
+            # Nothing is staged yet: show the first frame directly
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, self.pixel_format, GL_UNSIGNED_BYTE, frame)
+        else:
+            # Texture <- PBO staged last frame (offset 0 into the bound buffer)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbos[self.frame_index % 2])
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, self.pixel_format,
+                            GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        self.frame_index += 1
+        self._write_pbo(self.pbos[self.frame_index % 2], frame)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    def delete(self):
+        if self.pbos is not None:
+            glDeleteBuffers(2, self.pbos)
+        self.pbos = None
+        super().delete()
+
+
+# Selectable upload strategies, keyed by the name used in the scripts' config
+upload_strategies = {
+    "subimage": FeedTexture,
+    "pbo": PBOFeedTexture,
+}
+
+def make_feed_texture(strategy, texture_id=None, pixel_format=GL_RGB):
+    if strategy not in upload_strategies:
+        raise ValueError(f"Unknown upload strategy: {strategy}")
+    return upload_strategies[strategy](texture_id, pixel_format)
+
+
+# -------------------------------
+# All feeds as layers of one GL_TEXTURE_2D_ARRAY
+# -------------------------------
+# Layers share one allocation sized to the largest frame seen so far; smaller
+# frames sit in the lower-left corner of their layer and layer_scales() gives
+# the texcoord scale the shader applies per layer. Growing reallocates the
+# array and clears every layer; callers that only upload new frames should
+# re-upload each feed's current frame when `reallocations` changes.
+max_feed_layers = 16
+
+class FeedTextureArray:
+    def __init__(self, layers, strategy="subimage", pixel_format=GL_RGB):
+        if layers > max_feed_layers:
+            raise ValueError(f"At most {max_feed_layers} feeds fit in the texture array, got {layers}")
+        if strategy not in upload_strategies:
+            raise ValueError(f"Unknown upload strategy: {strategy}")
+        self.layers = layers
+        self.use_pbo = strategy == "pbo"
+        self.pixel_format = pixel_format
+        self.texture_id = None
+        self.size = None          # (width, height) of every layer's storage
+        self.reallocations = 0
+        self.frame_sizes = [None] * layers   # (width, height) currently held by each layer
+        self.scales = np.zeros((max_feed_layers, 2), dtype=np.float32)
+        # Per-layer PBO pairs and the frame size staged in each layer's PBO
+        self.pbos = None
+        self.frame_index = [0] * layers
+        self.staged = [None] * layers
+
+    def _allocate(self, width, height):
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, 0, GL_RGB8, width, height, self.layers,
+                     0, GL_RGB, GL_UNSIGNED_BYTE, None)
+        self.size = (width, height)
+        self.reallocations += 1
+        if self.use_pbo and self.pbos is None:
+            self.pbos = [glGenBuffers(2) for _ in range(self.layers)]
+        for layer, frame_size in enumerate(self.frame_sizes):
+            if frame_size is not None:
+                self._set_scale(layer, *frame_size)
+
+    def _set_scale(self, layer, width, height):
+        self.frame_sizes[layer] = (width, height)
+        self.scales[layer] = (width / self.size[0], height / self.size[1])
+
+    def _sub_image(self, layer, width, height, pixels):
+        glTexSubImage3D(GL_TEXTURE_2D_ARRAY, 0, 0, 0, layer, width, height, 1,
+                        self.pixel_format, GL_UNSIGNED_BYTE, pixels)
+        self._set_scale(layer, width, height)
+
+    def upload(self, layer, frame):
+        height, width = frame.shape[:2]
+        if self.texture_id is None:
+            self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        if self.size is None or width > self.size[0] or height > self.size[1]:
+            grown = (width, height) if self.size is None else \
+                (max(width, self.size[0]), max(height, self.size[1]))
+            self._allocate(*grown)
+        if not self.use_pbo:
+            self._sub_image(layer, width, height, frame)
+            return
+
+        # Same scheme as PBOFeedTexture, with one PBO pair per layer
+        pbos = self.pbos[layer]
+        staged = self.staged[layer]
+        if staged is None:
+            self._sub_image(layer, width, height, frame)
+        else:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbos[self.frame_index[layer] % 2])
+            self._sub_image(layer, staged[0], staged[1], ctypes.c_void_p(0))
+        self.frame_index[layer] += 1
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbos[self.frame_index[layer] % 2])
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, frame.nbytes, None, GL_STREAM_DRAW)
+        ptr = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+        if ptr:
+            ctypes.memmove(ptr, np.ascontiguousarray(frame).ctypes.data, frame.nbytes)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+            self.staged[layer] = (width, height)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    def layer_scales(self):
+        # (max_feed_layers, 2) float32, ready for glUniform2fv
+        return self.scales
+
+    def bind(self):
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture_id)
+
+    def delete(self):
+        if self.pbos is not None:
+            for pair in self.pbos:
+                glDeleteBuffers(2, pair)
+        self.pbos = None
+        if self.texture_id is not None:
+            glDeleteTextures([self.texture_id])
+        self.texture_id = None
+        self.size = None
@@ -0,0 +1,216 @@
+import collections
+import math
+
+import numpy as np
+
+# -------------------------------
+# Batched parabolic trajectories toward the dome (NumPy only, no GL)
+# -------------------------------
+# Every array has the batch on axis 0:
+#   starts, controls, ends  (N, 3)   quadratic Bézier control points
+#   points                  (N, S, 3) samples at S evenly spaced t in [0, 1]
+#   inside                  (N, S)   sample lies inside the hemisphere
+#   entered                 (N,)     trajectory entered the dome at all
+#   entry_t, exit_t         (N,)     exact curve parameters of the first entry and
+#                                    the following exit, NaN when there is none
+#   first_entry, exit_points (N, 3)  points at entry_t / exit_t, NaN when none
+#   base_hits               (N, 3)   landing point (last sample)
+TrajectoryBatch = collections.namedtuple(
+    "TrajectoryBatch",
+    ["starts", "controls", "ends", "points", "inside", "entered", "entry_t", "exit_t",
+     "first_entry", "exit_points", "base_hits"])
+
+def random_trajectory_params(count, dome_radius, rng):
+    # Same distributions as the scripts' generate_parabolic_trajectory()
+    angle = rng.uniform(0, 2 * math.pi, count)
+    r_start = rng.uniform(dome_radius + 100, dome_radius + 300, count)
+    angle_end = rng.uniform(0, 2 * math.pi, count)
+    r_end = rng.uniform(0, dome_radius - 10, count)
+    control_y = rng.uniform(dome_radius / 2, dome_radius, count)  # high arch
+
+    starts = np.zeros((count, 3))
+    starts[:, 0] = r_start * np.cos(angle)
+    starts[:, 2] = r_start * np.sin(angle)
+    ends = np.zeros((count, 3))
+    ends[:, 0] = r_end * np.cos(angle_end)
+    ends[:, 2] = r_end * np.sin(angle_end)
+    controls = (starts + ends) / 2
+    controls[:, 1] = control_y
+    return starts, controls, ends
+
+def bezier_points(starts, controls, ends, segments):
+    t = np.linspace(0, 1, segments)[None, :, None]
+    return ((1 - t) ** 2 * starts[:, None, :]
+            + 2 * (1 - t) * t * controls[:, None, :]
+            + t ** 2 * ends[:, None, :])
+
+def bezier_at(starts, controls, ends, t):
+    # One point per trajectory at its own parameter t (N,); NaN t gives NaN
+    t = t[:, None]
+    return (1 - t) ** 2 * starts + 2 * (1 - t) * t * controls + t ** 2 * ends
+
+# -------------------------------
+# Exact dome crossings
+# -------------------------------
+# Writing B(t) = a t^2 + b t + c, the dome surface |B(t)|^2 = R^2 is the quartic
+#   (a.a) t^4 + 2 (a.b) t^3 + (b.b + 2 a.c) t^2 + 2 (b.c) t + (c.c - R^2) = 0.
+# Its roots for the whole batch are the eigenvalues of stacked 4x4 companion
+# matrices, polished with two Newton steps. A root where |B|^2 - R^2 is
+# decreasing enters the sphere, an increasing one exits it. The scripts'
+# trajectories stay at y >= 0, so sphere crossings are hemisphere crossings.
+def _crossing_polynomials(starts, controls, ends, radius):
+    a = starts - 2 * controls + ends
+    b = 2 * (controls - starts)
+    c = starts
+    dot = lambda u, v: np.einsum("ij,ij->i", u, v)
+    return np.stack([dot(a, a), 2 * dot(a, b), dot(b, b) + 2 * dot(a, c),
+                     2 * dot(b, c), dot(c, c) - radius ** 2], axis=1)
+
+def _polyval(coeffs, t):
+    value = np.zeros_like(t)
+    for k in range(coeffs.shape[1]):
+        value = value * t + coeffs[:, k:k + 1]
+    return value
+
+def hemisphere_crossings(starts, controls, ends, radius):
+    # Returns (entry_t, exit_t), NaN where a trajectory has no such crossing
+    count = len(starts)
+    coeffs = _crossing_polynomials(starts, controls, ends, radius)
+    lead = coeffs[:, 0]
+    # a.a == 0 only for straight-line "curves"; the scripts never produce them,
+    # but keep them finite by nudging the leading coefficient
+    scale = np.abs(coeffs).max(axis=1)
+    lead = np.where(np.abs(lead) < 1e-12 * np.maximum(scale, 1.0), 1e-12 * np.maximum(scale, 1.0), lead)
+    companion = np.zeros((count, 4, 4))
+    companion[:, 0, :] = -coeffs[:, 1:] / lead[:, None]
+    companion[:, 1, 0] = companion[:, 2, 1] = companion[:, 3, 2] = 1.0
+    roots = np.linalg.eigvals(companion)
+
+    real = np.abs(roots.imag) <= 1e-6 * (1 + np.abs(roots.real))
+    t = np.where(real, roots.real, np.nan)
+    derivative = coeffs[:, :4] * np.array([4.0, 3.0, 2.0, 1.0])
+    for _ in range(2):
+        slope = _polyval(derivative, t)
+        step = np.where(slope != 0, _polyval(coeffs, t) / np.where(slope != 0, slope, 1.0), 0.0)
+        t = t - step
+    t = np.where((t >= -1e-9) & (t <= 1 + 1e-9), np.clip(t, 0.0, 1.0), np.nan)
+    slope = _polyval(derivative, t)
+
+    # NaN roots compare False everywhere and drop out of both minima.
+    # Trajectories that start inside the dome enter at t = 0.
+    entry_t = np.where(slope < 0, t, np.inf).min(axis=1)
+    entry_t = np.where(coeffs[:, 4] <= 0, 0.0, entry_t)
+    exit_t = np.where((slope > 0) & (t > entry_t[:, None]), t, np.inf).min(axis=1)
+    entry_t[np.isinf(entry_t)] = np.nan
+    exit_t[np.isinf(exit_t) | np.isnan(entry_t)] = np.nan
+    return entry_t, exit_t
+
+def evaluate_trajectories(starts, controls, ends, dome_radius, segments=50):
+    points = bezier_points(starts, controls, ends, segments)
+    inside = ((np.einsum("nsk,nsk->ns", points, points) <= dome_radius ** 2)
+              & (points[..., 1] >= 0))
+    entry_t, exit_t = hemisphere_crossings(starts, controls, ends, dome_radius)
+    entered = ~np.isnan(entry_t)
+    first_entry = bezier_at(starts, controls, ends, entry_t)
+    exit_points = bezier_at(starts, controls, ends, exit_t)
+    return TrajectoryBatch(starts, controls, ends, points, inside, entered, entry_t, exit_t,
+                           first_entry, exit_points, points[:, -1].copy())
+
+def generate_trajectories(count, dome_radius, segments=50, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    starts, controls, ends = random_trajectory_params(count, dome_radius, rng)
+    return evaluate_trajectories(starts, controls, ends, dome_radius, segments)
+
+# -------------------------------
+# Bounded structure-of-arrays store for trajectories and hits
+# -------------------------------
+# Each category is a ring of float32 rows with a timestamp per row. Appending
+# writes at most two contiguous slices; once full, the oldest rows are
+# overwritten. Rows older than max_age (seconds) are dropped by expire().
+class PointRing:
+    def __init__(self, capacity, width=3, max_age=None):
+        self.capacity = capacity
+        self.width = width
+        self.max_age = max_age
+        self.data = np.zeros((capacity, width), dtype=np.float32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.start = 0       # physical index of the oldest row
+        self.size = 0
+        self.appended = 0    # rows ever appended; lets consumers track new ranges
+
+    def append(self, rows, now=0.0):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, self.width)
+        if len(rows) > self.capacity:
+            rows = rows[-self.capacity:]
+        count = len(rows)
+        if count == 0:
+            return
+        end = (self.start + self.size) % self.capacity
+        first = min(count, self.capacity - end)
+        self.data[end:end + first] = rows[:first]
+        self.times[end:end + first] = now
+        self.data[:count - first] = rows[first:]
+        self.times[:count - first] = now
+        self.appended += count
+        overflow = self.size + count - self.capacity
+        if overflow > 0:
+            self.start = (self.start + overflow) % self.capacity
+            self.size = self.capacity
+        else:
+            self.size += count
+
+    def expire(self, now):
+        if self.max_age is None or self.size == 0:
+            return
+        cutoff = now - self.max_age
+        # Timestamps are non-decreasing from the oldest row, so count the
+        # expired prefix with a binary search on each physical segment
+        dropped = 0
+        for first, last in self.ranges():
+            stale = int(np.searchsorted(self.times[first:last], cutoff, side="left"))
+            dropped += stale
+            if stale < last - first:
+                break
+        self.start = (self.start + dropped) % self.capacity
+        self.size -= dropped
+
+    def ranges(self):
+        # Physical [first, last) index ranges holding live rows, oldest first
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [(self.start, end)] if self.size else []
+        return [(self.start, self.capacity), (0, end - self.capacity)]
+
+    def views(self):
+        # Contiguous float32 views for the renderer; no copies
+        return [self.data[first:last] for first, last in self.ranges()]
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+
+class TrajectoryStore:
+    # lines holds (start xyz, end xyz) per trajectory; the others one point per row
+    def __init__(self, capacity=100000, point_capacity=1000000, max_age=None):
+        self.lines = PointRing(capacity, width=6, max_age=max_age)
+        self.dome_hits = PointRing(capacity, max_age=max_age)
+        self.inside_tracks = PointRing(point_capacity, max_age=max_age)
+        self.base_hits = PointRing(capacity, max_age=max_age)
+
+    def rings(self):
+        return {"lines": self.lines, "dome_hits": self.dome_hits,
+                "inside_tracks": self.inside_tracks, "base_hits": self.base_hits}
+
+    def add_batch(self, batch, now=0.0):
+        self.lines.append(np.concatenate([batch.starts, batch.base_hits], axis=1), now)
+        self.dome_hits.append(batch.first_entry[batch.entered], now)
+        self.inside_tracks.append(batch.points[batch.inside], now)
+        self.base_hits.append(batch.base_hits, now)
+
+    def expire(self, now):
+        for ring in self.rings().values():
+            ring.expire(now)
@@ -0,0 +1,90 @@
+import numpy as np
+from OpenGL.GL import *
+
+# -------------------------------
+# GPU mirrors of the trajectory rings
+# -------------------------------
+# Each PointRing gets a vertex buffer of the same capacity, allocated once.
+# sync() uploads only the rows appended since the last sync (at most two
+# glBufferSubData calls when the range wraps), so per-frame cost follows the
+# number of new rows rather than everything ever stored. draw() issues one call
+# per category: glDrawArrays, or glMultiDrawArrays when live rows wrap.
+class GLRing:
+    def __init__(self, ring, mode, color):
+        self.ring = ring
+        self.mode = mode
+        self.color = color
+        self.vertices_per_row = ring.width // 3
+        self.row_bytes = ring.width * 4
+        self.buffer = None
+        self.uploaded = 0   # ring.appended at the last sync
+
+    def _upload_rows(self, first, count):
+        glBufferSubData(GL_ARRAY_BUFFER, first * self.row_bytes, count * self.row_bytes,
+                        self.ring.data[first:first + count])
+
+    def sync(self):
+        ring = self.ring
+        if self.buffer is None:
+            self.buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+            glBufferData(GL_ARRAY_BUFFER, ring.capacity * self.row_bytes, None, GL_DYNAMIC_DRAW)
+            self.uploaded = ring.appended - ring.size   # everything live is new
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        # Rows appended then overwritten or expired before this sync are skipped
+        new = min(ring.appended - self.uploaded, ring.size)
+        if new > 0:
+            end = (ring.start + ring.size) % ring.capacity or ring.capacity
+            first = end - new
+            if first >= 0:
+                self._upload_rows(first, new)
+            else:
+                self._upload_rows(ring.capacity + first, -first)
+                self._upload_rows(0, end)
+        self.uploaded = ring.appended
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        self.sync()
+        ranges = self.ring.ranges()
+        if not ranges:
+            return
+        glColor3f(*self.color)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        firsts = [first * self.vertices_per_row for first, _ in ranges]
+        counts = [(last - first) * self.vertices_per_row for first, last in ranges]
+        if len(ranges) == 1:
+            glDrawArrays(self.mode, firsts[0], counts[0])
+        else:
+            glMultiDrawArrays(self.mode, np.array(firsts, dtype=np.int32),
+                              np.array(counts, dtype=np.int32), len(ranges))
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+        self.buffer = None
+
+class TrajectoryRenderer:
+    def __init__(self, store, point_size=6):
+        self.point_size = point_size
+        self.lines = GLRing(store.lines, GL_LINES, (1, 0, 0))
+        self.points = [
+            GLRing(store.dome_hits, GL_POINTS, (1, 0, 0)),
+            GLRing(store.inside_tracks, GL_POINTS, (1, 1, 0)),
+            GLRing(store.base_hits, GL_POINTS, (1, 0, 0)),
+        ]
+
+    def draw(self):
+        self.lines.draw()
+        glPointSize(self.point_size)
+        for ring in self.points:
+            ring.draw()
+
+    def delete(self):
+        for ring in [self.lines] + self.points:
+            ring.delete()
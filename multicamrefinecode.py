@@ -8,6 +8,10 @@ import math
 import os
 import random
 
+from dome_layout import compile_layout, draw_batches, make_layout
+from dome_mesh import dome_mesh
+from dome_startup import open_sources_or_placeholders
+
 # -------------------------------
 # Global parameters
 # -------------------------------
@@ -16,6 +20,10 @@ dome_radius = 300  # Inner dome radius
 video_folder = "/home/sakthees/Videos/chola-domepython/videos"
 video_files = ["tree.mp4", "free.mp4", "sree.mp4", "extra.mp4"]
 speed_factor = 0.5
+dome_slices, dome_stacks = 30, 15
+# Which feed shows where on the dome (dome_layout.layouts), e.g. "quarter_slices"
+feed_layout = "cap_front"
+feed_layout_options = {"mapping": "quad"}
 
 # Camera parameters
 zoom_factor = 1.0
@@ -29,22 +37,30 @@ inside_tracks = []   # Yellow locus for the portion of the trajectory inside the
 base_hits = []       # Red points on the base circle of the dome
 
 # -------------------------------
-# Initialize webcam and video files
+# Initialize webcam and video files (opened by main() once the window is up)
 # -------------------------------
-cap_webcam = cv2.VideoCapture(0)
-if not cap_webcam.isOpened():
-    print("Error: Could not open webcam")
-    exit()
-
-caps_videos = [cv2.VideoCapture(os.path.join(video_folder, vid)) for vid in video_files]
-for cap in caps_videos:
-    if not cap.isOpened():
-        print(f"Error: Could not open video {cap}")
-        exit()
-
-# Generate texture IDs
-texture_webcam = glGenTextures(1)
-texture_videos = glGenTextures(len(caps_videos))
+# All sources open in parallel; one that is missing, fails or misses
+# source_open_timeout (seconds) shows a placeholder pattern instead of
+# stopping the program. Any dome_sources.open_source() spec works.
+webcam_source = "device:0"
+video_sources = [os.path.join(video_folder, vid) for vid in video_files]
+source_open_timeout = 5.0
+source_names = ["webcam"] + video_files
+cap_webcam = None
+caps_videos = []
+texture_webcam = None
+texture_videos = []
+
+def open_feeds():
+    global cap_webcam, caps_videos, texture_webcam, texture_videos
+    sources, failures = open_sources_or_placeholders([webcam_source] + video_sources, source_names,
+                                                     source_open_timeout)
+    for name, error in failures.items():
+        print(f"Warning: {name} unavailable ({error}); showing a placeholder")
+    cap_webcam, caps_videos = sources[0], sources[1:]
+    # Texture IDs need the GL context, which exists by now
+    texture_webcam = glGenTextures(1)
+    texture_videos = glGenTextures(len(caps_videos))
 
 # -------------------------------
 # Function to load a frame into a texture
@@ -52,7 +68,7 @@ texture_videos = glGenTextures(len(caps_videos))
 def load_texture(cap, texture_id):
     ret, frame = cap.read()
     if not ret:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Restart video if it ends
+        cap.rewind()  # Restart video if it ends
         ret, frame = cap.read()
     # Use high resolution from webcam if available
     frame = cv2.flip(frame, 0)
@@ -68,81 +84,36 @@ def load_texture(cap, texture_id):
 # -------------------------------
 # Draw Dome with Textures
 # -------------------------------
+# Webcam on the top cap, the videos split the front 90°, black elsewhere; each
+# quad shows its feed's whole image. The layout is compiled once into one
+# contiguous run of quads per feed, so a frame uploads every feed once and then
+# binds and draws each run.
+compiled_layout = None
+
 def draw_textured_dome():
-    slices, stacks = 30, 15
-    glEnable(GL_TEXTURE_2D)
+    global compiled_layout
+    mesh = dome_mesh(dome_radius, dome_slices, dome_stacks)
+    if mesh.layout != feed_layout:
+        regions = make_layout(feed_layout, len(caps_videos), **feed_layout_options)
+        compiled_layout = compile_layout(mesh, regions, feed_layout)
+    feed_textures = [texture_webcam] + list(texture_videos)
+    feed_caps = [cap_webcam] + caps_videos
+    for feed, _, _ in compiled_layout.batches:
+        if feed >= 0:
+            load_texture(feed_caps[feed], feed_textures[feed])
+
+    def bind(feed):
+        if feed < 0:
+            glDisable(GL_TEXTURE_2D)
+            glColor3f(0, 0, 0)
+        else:
+            glEnable(GL_TEXTURE_2D)
+            glColor3f(1, 1, 1)
+            glBindTexture(GL_TEXTURE_2D, feed_textures[feed])
+
     # Disable face culling so textures show on both sides
     glDisable(GL_CULL_FACE)
-    
-    # Loop over stacks and slices to map the dome
-    glBegin(GL_QUADS)
-    for i in range(stacks):
-        theta0 = (i / stacks) * (math.pi / 2)
-        theta1 = ((i + 1) / stacks) * (math.pi / 2)
-        for j in range(slices):
-            phi0 = (j / slices) * 2 * math.pi
-            phi1 = ((j + 1) / slices) * 2 * math.pi
-            
-            # Compute vertices in spherical coordinates
-            xA = dome_radius * math.sin(theta0) * math.cos(phi0)
-            yA = dome_radius * math.cos(theta0)
-            zA = dome_radius * math.sin(theta0) * math.sin(phi0)
-            
-            xB = dome_radius * math.sin(theta1) * math.cos(phi0)
-            yB = dome_radius * math.cos(theta1)
-            zB = dome_radius * math.sin(theta1) * math.sin(phi0)
-            
-            xC = dome_radius * math.sin(theta1) * math.cos(phi1)
-            yC = dome_radius * math.cos(theta1)
-            zC = dome_radius * math.sin(theta1) * math.sin(phi1)
-            
-            xD = dome_radius * math.sin(theta0) * math.cos(phi1)
-            yD = dome_radius * math.cos(theta0)
-            zD = dome_radius * math.sin(theta0) * math.sin(phi1)
-            
-            # Determine which texture to use for this quad:
-            # Convert phi to an adjusted value in [-pi, pi]
-            phi_avg = (phi0 + phi1) / 2.0
-            if phi_avg > math.pi:
-                phi_adjusted = phi_avg - 2 * math.pi
-            else:
-                phi_adjusted = phi_avg
-            
-            # If near the top (small theta) use live webcam feed
-            if theta0 < 0.3:
-                # Use webcam texture
-                load_texture(cap_webcam, texture_webcam)
-                glBindTexture(GL_TEXTURE_2D, texture_webcam)
-            # Else if in front region: |phi_adjusted| <= 45° (pi/4 radians)
-            elif abs(phi_adjusted) <= math.pi/4:
-                # Divide the front region (90° total) into 4 segments (each 22.5°)
-                # Map phi_adjusted from [-pi/4, pi/4] to [0, 1]
-                seg_ratio = (phi_adjusted + (math.pi/4)) / (math.pi/2)
-                seg_index = int(seg_ratio * 4)
-                seg_index = min(max(seg_index, 0), 3)
-                load_texture(caps_videos[seg_index], texture_videos[seg_index])
-                glBindTexture(GL_TEXTURE_2D, texture_videos[seg_index])
-            else:
-                # For the rest of the dome, use a default (black) color
-                glDisable(GL_TEXTURE_2D)
-                glColor3f(0, 0, 0)
-            
-            # Set texture coordinates and specify vertices for the quad
-            if glIsEnabled(GL_TEXTURE_2D):
-                glColor3f(1, 1, 1)
-                glTexCoord2f(0, 0); glVertex3f(xA, yA, zA)
-                glTexCoord2f(0, 1); glVertex3f(xB, yB, zB)
-                glTexCoord2f(1, 1); glVertex3f(xC, yC, zC)
-                glTexCoord2f(1, 0); glVertex3f(xD, yD, zD)
-            else:
-                glVertex3f(xA, yA, zA)
-                glVertex3f(xB, yB, zB)
-                glVertex3f(xC, yC, zC)
-                glVertex3f(xD, yD, zD)
-            
-            # Re-enable texture if it was disabled
-            glEnable(GL_TEXTURE_2D)
-    glEnd()
+    draw_batches(mesh, compiled_layout, bind)
     glDisable(GL_TEXTURE_2D)
 
 # -------------------------------
@@ -216,6 +187,10 @@ def main():
     pygame.init()
     screen = pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
     pygame.display.set_caption("Dome Projection: 4 Videos Front, Webcam Top")
+    # Window first, so something is on screen while the sources open
+    glClear(GL_COLOR_BUFFER_BIT)
+    pygame.display.flip()
+    open_feeds()
     glEnable(GL_DEPTH_TEST)
     # Disable face culling so both sides are visible
     glDisable(GL_CULL_FACE)
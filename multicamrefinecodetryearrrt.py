@@ -8,14 +8,28 @@ import math
 import os
 import random
 
+from dome_layout import compile_layout, make_layout
+from dome_mesh import dome_mesh
+from dome_profile import FrameProfiler
+from dome_profile_hud import ProfilerHUD
+from dome_shaders import FeedArrayProgram
+from dome_startup import open_sources_or_placeholders
+from dome_textures import FeedTextureArray
+
 # -------------------------------
 # Global parameters
 # -------------------------------
 dome_radius = 300  # Inner dome radius
+dome_slices, dome_stacks = 30, 15
 video_folder = "/home/sakthees/Videos/chola-domepython/videos"
 # Specify the video filenames you expect in the folder:
 video_files = ["tree.mp4", "free.mp4", "sree.mp4", "extra.mp4"]
 speed_factor = 0.5
+# Which feed shows where on the dome (dome_layout.layouts): the webcam on the
+# first quarter turn, the videos sharing the rest, each stretched over its run
+feed_layout = "quarter_slices"
+# Per-stage frame timing; F3 toggles it with its on-screen HUD
+profiler = FrameProfiler(enabled=False)
 
 # Camera parameters
 zoom_factor = 1.0
@@ -29,114 +43,65 @@ inside_tracks = []   # Yellow locus for the portion of the trajectory inside the
 base_hits = []       # Red points on the base circle of the dome
 
 # -------------------------------
-# Check video files and open them
-# -------------------------------
-valid_video_paths = []
-for vid in video_files:
-    path = os.path.join(video_folder, vid)
-    if not os.path.exists(path):
-        print(f"Error: File does not exist: {path}")
-    else:
-        valid_video_paths.append(path)
-
-if not valid_video_paths:
-    print("No valid video files found! Exiting.")
-    exit()
-
-# -------------------------------
-# Initialize webcam
-# -------------------------------
-cap_webcam = cv2.VideoCapture(0)
-if not cap_webcam.isOpened():
-    print("Error: Could not open webcam")
-    exit()
-
-# -------------------------------
-# Open valid video files using OpenCV
+# Webcam and video files (opened by main() once the window is up)
 # -------------------------------
+# All sources open in parallel; one that is missing, fails or misses
+# source_open_timeout (seconds) shows a placeholder pattern instead of
+# stopping the program. Any dome_sources.open_source() spec works.
+webcam_source = "device:0"
+video_sources = [os.path.join(video_folder, vid) for vid in video_files]
+source_open_timeout = 5.0
+source_names = ["webcam"] + video_files
+cap_webcam = None
 caps_videos = []
-for path in valid_video_paths:
-    cap = cv2.VideoCapture(path)
-    if not cap.isOpened():
-        print(f"Error: Could not open video: {path}")
-        exit()
-    else:
-        print(f"Opened video: {path}")
-        caps_videos.append(cap)
 
-# Generate texture IDs
-texture_webcam = glGenTextures(1)
-texture_videos = glGenTextures(len(caps_videos))
+def open_feeds():
+    global cap_webcam, caps_videos
+    sources, failures = open_sources_or_placeholders([webcam_source] + video_sources, source_names,
+                                                     source_open_timeout)
+    for name, error in failures.items():
+        print(f"Warning: {name} unavailable ({error}); showing a placeholder")
+    cap_webcam, caps_videos = sources[0], sources[1:]
+
+# All feeds live in one texture array: layer 0 is the webcam, layer 1 + i is video i
+feed_array = FeedTextureArray(len(source_names))
+feed_program = FeedArrayProgram()
 
 # -------------------------------
 # Function to load a frame into a texture
 # -------------------------------
-def load_texture(cap, texture_id):
-    ret, frame = cap.read()
-    if not ret:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Restart video if it ends
+def load_texture(cap, layer):
+    with profiler.stage("read"):
         ret, frame = cap.read()
-    frame = cv2.flip(frame, 0)
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    frame_data = frame.tobytes()
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, frame.shape[1], frame.shape[0],
-                 0, GL_RGB, GL_UNSIGNED_BYTE, frame_data)
+        if not ret:
+            cap.rewind()  # Restart video if it ends
+            ret, frame = cap.read()
+    if not ret:
+        return False
+    with profiler.stage("convert"):
+        frame = cv2.flip(frame, 0)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    with profiler.stage("upload"):
+        feed_array.upload(layer, frame)
     return True
 
 # -------------------------------
 # Draw Dome with Webcam and Video Feeds
 # -------------------------------
 def draw_textured_dome():
-    slices, stacks = 30, 15
-    glEnable(GL_TEXTURE_2D)
-    glDisable(GL_CULL_FACE)  # Disable face culling so both sides are visible
-    
-    # Draw front patch using webcam texture (first quarter of slices)
-    if load_texture(cap_webcam, texture_webcam):
-        glBindTexture(GL_TEXTURE_2D, texture_webcam)
-        glBegin(GL_QUADS)
-        for i in range(stacks):
-            theta0 = (i / stacks) * (math.pi / 2)
-            theta1 = ((i + 1) / stacks) * (math.pi / 2)
-            for j in range(slices // 4):
-                phi = (j / slices) * (2 * math.pi)
-                x0 = dome_radius * math.sin(theta0) * math.cos(phi)
-                y0 = dome_radius * math.cos(theta0)
-                z0 = dome_radius * math.sin(theta0) * math.sin(phi)
-                x1 = dome_radius * math.sin(theta1) * math.cos(phi)
-                y1 = dome_radius * math.cos(theta1)
-                z1 = dome_radius * math.sin(theta1) * math.sin(phi)
-                glTexCoord2f(j / slices, i / stacks)
-                glVertex3f(x0, y0, z0)
-                glTexCoord2f(j / slices, (i + 1) / stacks)
-                glVertex3f(x1, y1, z1)
-        glEnd()
-    
-    # Draw remaining dome sections using video textures
+    # Upload every feed once, then draw the whole dome with one bind and one call
+    load_texture(cap_webcam, 0)
     for idx, cap in enumerate(caps_videos):
-        if load_texture(cap, texture_videos[idx]):
-            glBindTexture(GL_TEXTURE_2D, texture_videos[idx])
-            glBegin(GL_QUADS)
-            for i in range(stacks):
-                theta0 = (i / stacks) * (math.pi / 2)
-                theta1 = ((i + 1) / stacks) * (math.pi / 2)
-                for j in range(slices // 4, slices):
-                    phi = (j / slices) * (2 * math.pi)
-                    x0 = dome_radius * math.sin(theta0) * math.cos(phi)
-                    y0 = dome_radius * math.cos(theta0)
-                    z0 = dome_radius * math.sin(theta0) * math.sin(phi)
-                    x1 = dome_radius * math.sin(theta1) * math.cos(phi)
-                    y1 = dome_radius * math.cos(theta1)
-                    z1 = dome_radius * math.sin(theta1) * math.sin(phi)
-                    glTexCoord2f(j / slices, i / stacks)
-                    glVertex3f(x0, y0, z0)
-                    glTexCoord2f(j / slices, (i + 1) / stacks)
-                    glVertex3f(x1, y1, z1)
-            glEnd()
-    glDisable(GL_TEXTURE_2D)
+        load_texture(cap, 1 + idx)
+    if feed_array.texture_id is None:
+        return
+    mesh = dome_mesh(dome_radius, dome_slices, dome_stacks)
+    if mesh.layout != feed_layout:
+        compile_layout(mesh, make_layout(feed_layout, len(caps_videos)), feed_layout)
+    glDisable(GL_CULL_FACE)  # Disable face culling so both sides are visible
+    feed_program.use(feed_array)
+    mesh.draw()
+    feed_program.release()
 
 # -------------------------------
 # Draw Trajectories and Hit Points
@@ -209,6 +174,10 @@ def main():
     pygame.init()
     screen = pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
     pygame.display.set_caption("Dome Projection with Videos & Webcam")
+    # Window first, so something is on screen while the sources open
+    glClear(GL_COLOR_BUFFER_BIT)
+    pygame.display.flip()
+    open_feeds()
     glEnable(GL_DEPTH_TEST)
     glDisable(GL_CULL_FACE)
     glMatrixMode(GL_PROJECTION)
@@ -217,9 +186,12 @@ def main():
     glMatrixMode(GL_MODELVIEW)
     
     clock = pygame.time.Clock()
+    hud = ProfilerHUD(profiler)
     running = True
     while running:
-        for event in pygame.event.get():
+        with profiler.stage("events"):
+            events = pygame.event.get()
+        for event in events:
             if event.type == QUIT:
                 running = False
             if event.type == KEYDOWN:
@@ -235,6 +207,8 @@ def main():
                     zoom_factor = max(0.1, zoom_factor - 0.1)
                 elif event.key in (K_MINUS, K_KP_MINUS):
                     zoom_factor += 0.1
+                elif event.key == K_F3:
+                    profiler.enabled = not profiler.enabled
         
         # Continuous zoom in if Ctrl is held and left mouse button is pressed
         if pygame.mouse.get_pressed()[0] and (pygame.key.get_mods() & KMOD_CTRL):
@@ -253,11 +227,18 @@ def main():
         cam_z = distance * math.cos(camera_yaw) * math.cos(camera_pitch)
         gluLookAt(cam_x, cam_y, cam_z, 0, dome_radius/2, 0, 0, 1, 0)
         
-        draw_textured_dome()
-        draw_trajectories()
+        with profiler.stage("dome"):
+            draw_textured_dome()
+        with profiler.stage("trajectories"):
+            draw_trajectories()
+        if profiler.enabled:
+            hud.draw(600)
         
-        pygame.display.flip()
-        clock.tick(30)
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        with profiler.stage("pace"):
+            clock.tick(30)
+        profiler.end_frame()
     
     cap_webcam.release()
     for cap in caps_videos:
@@ -1,12 +1,32 @@
-import cv2
 import numpy as np
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+import json
 import math
 import os
-import random
+import time
+
+from dome_capture import CaptureThread, ProcessCapture
+from dome_frame_cache import FrameCache, default_cache_dir
+from dome_layout import make_layout, shader_regions
+from dome_mesh import DomeLOD
+from dome_pacing import FrameGovernor
+from dome_profile import FrameProfiler
+from dome_profile_hud import ProfilerHUD
+from dome_replay import ReplayLog, ReplayWriter, TrajectorySpawner
+from dome_shaders import AngularFeedProgram
+from dome_sources import PlaceholderSource, open_source
+from dome_spatial import GridIndex, SectorIndex, spherical_angles
+from dome_startup import StartupTimer, open_sources_or_placeholders
+from dome_trajectories import TrajectoryStore, evaluate_trajectories
+from dome_trajectory_gl import TrajectoryRenderer
+from dome_textures import FeedTextureArray
+
+# Cold-start marks, measured from process start so imports are included
+startup = StartupTimer()
+startup.mark("imports")
 
 # -------------------------------
 # Global parameters
@@ -15,207 +35,305 @@ dome_radius = 300  # Inner dome radius
 # Update video_files to include 4 video files
 video_folder = "/home/sakthees/Videos/chola-domepython/videos"
 video_files = ["tree.mp4", "free.mp4", "sree.mp4"]
+# Feed sources, webcam first; any dome_sources.open_source() spec works here,
+# e.g. "pattern:1280x720@30" or "raw:clip.raw" to take decoding out of a run
+webcam_source = "device:0"
+video_sources = [os.path.join(video_folder, vid) for vid in video_files]
+# Looping clips can be decoded once into a memory-mapped cache (rebuilt when a
+# clip changes) instead of being decoded forever; frame_cache_size=(w, h)
+# downscales them to the texture size while caching
+use_frame_cache = False
+frame_cache_dir = default_cache_dir
+frame_cache_budget = 8 << 30    # bytes; least recently used clips go first
+frame_cache_size = None
 speed_factor = 0.5
+# Which feed shows where on the dome, a dome_layout.layouts name:
+#   "cap_front"       webcam on the top cap, videos split the front arc
+#   "quarter_slices"  webcam on the first quarter turn, videos share the rest
+# feed_layout_options go to the layout, e.g. {"cap_theta": 0.4}
+feed_layout = "cap_front"
+feed_layout_options = {}
+# "thread": decode videos on worker threads in this process
+# "process": one decode process per video feeding a shared-memory frame ring
+decode_mode = "thread"
+# "subimage": synchronous glTexSubImage2D into persistent storage
+# "pbo": asynchronous upload through two alternating pixel buffer objects
+upload_strategy = "subimage"
+# "bgr": copy-free path, OpenCV's BGR buffers are uploaded as-is and flipped in texcoords
+# "rgb": frames are flipped and converted on the CPU into preallocated buffers
+frame_path = "bgr"
+
+# Frame pacing: the governor lowers feed resolution, dome LOD and trajectory
+# density when frames overrun 1 / target_fps, and raises them with headroom
+target_fps = 30
+use_vsync = False
+trajectory_segments = 50
+
+# Reproducible runs: simulation_seed fixes the spawn schedule and trajectory
+# parameters (None draws a fresh seed and prints it). replay_record_path logs
+# every spawned trajectory; replay_path plays a log back instead of spawning.
+# `python dome_replay.py replay <log>` runs a log headless, faster than real time.
+simulation_seed = None
+replay_record_path = None
+replay_path = None
+
+# Per-stage frame timing (F3 toggles it with its on-screen HUD). Traces of the
+# last frames are written on exit when the paths are set; open the JSON in
+# chrome://tracing or Perfetto.
+profile_stages = False
+profile_trace_path = None    # e.g. "dome_trace.json"
+profile_csv_path = None      # e.g. "dome_stages.csv"
+profiler = FrameProfiler(enabled=profile_stages)
 
 # Camera parameters
 zoom_factor = 1.0
 camera_yaw = 0.0
 camera_pitch = 0.0
 
-# Trajectory data (unchanged from before)
-trajectories = []    # List of (start_point, end_point) tuples for drawn trajectory lines
-dome_hits = []       # Permanent red hit points on the dome when the trajectory first enters
-inside_tracks = []   # Yellow locus for the portion of the trajectory inside the dome
-base_hits = []       # Red points on the base circle of the dome
+# Trajectory data, kept in bounded float32 rings:
+#   lines          (start_point, end_point) of each drawn trajectory line
+#   dome_hits      red hit points on the dome where a trajectory first enters
+#   inside_tracks  yellow locus for the portion of a trajectory inside the dome
+#   base_hits      red points on the base circle of the dome
+# Once a ring is full the oldest entries are overwritten; trajectory_max_age
+# (seconds, None = keep until overwritten) also drops entries by age.
+trajectory_capacity = 100000
+inside_track_capacity = 1000000
+trajectory_max_age = None
+trajectory_store = TrajectoryStore(trajectory_capacity, inside_track_capacity, trajectory_max_age)
+# GPU copies of the rings; only newly added rows are uploaded each frame
+trajectory_renderer = TrajectoryRenderer(trajectory_store)
+# Spatial indexes over the dome hits for picking (grid) and sector queries
+# (theta/phi bins); both catch up with new rows after each batch is added
+hit_grid = GridIndex(trajectory_store.dome_hits)
+hit_sectors = SectorIndex(trajectory_store.dome_hits)
+pick_radius = 30.0
 
 # -------------------------------
-# Initialize webcam and video files
+# Initialize webcam and video files (opened by main() once the window is up)
 # -------------------------------
-cap_webcam = cv2.VideoCapture(0)
-if not cap_webcam.isOpened():
-    print("Error: Could not open webcam")
-    exit()
+# All sources open in parallel; one that fails or misses source_open_timeout
+# (seconds) shows a placeholder pattern instead of stopping the program; a
+# source that opens later is released. With use_frame_cache, clips missing
+# from the cache are decoded during this step: a decode that outlasts the
+# timeout keeps filling the cache for the next run and is cancelled on exit,
+# so raise the timeout to show the clip on the first run.
+source_open_timeout = 5.0
+# Startup measurement: exit as soon as every feed has shown a frame (or after
+# startup_measure_limit seconds) and print the startup marks as JSON
+measure_startup = False
+startup_measure_limit = 30.0
+startup_report_path = None
+
+convert_frames = frame_path == "rgb"
+source_names = ["webcam"] + [os.path.basename(spec) for spec in video_sources]
+if use_frame_cache:
+    frame_cache = FrameCache(frame_cache_dir, frame_cache_budget)
+cap_webcam = None
+caps_videos = []
+capture_webcam = None
+capture_videos = []
+# Per-source counters: frames taken by the renderer in the last completed tick,
+# so upload cost can be checked against slices/stacks.
+reads_per_frame = {name: 0 for name in source_names}
+feed_seen = [False] * len(source_names)
+
+# All feeds live in one texture array: layer 0 is the webcam, layer 1 + i is
+# video i. The texture and its storage are created on the first frame, once a
+# GL context exists, and kept until a feed arrives at a larger resolution.
+feed_array = FeedTextureArray(len(source_names), upload_strategy,
+                              GL_RGB if convert_frames else GL_BGR)
+feed_program = AngularFeedProgram(flip_v=not convert_frames)
+
+def open_feed_source(spec):
+    # Runs on an opener thread, so clips missing from the cache decode in parallel
+    if use_frame_cache and os.path.isfile(spec):
+        return frame_cache.open(spec, frame_cache_size)
+    return open_source(spec)
 
-caps_videos = [cv2.VideoCapture(os.path.join(video_folder, vid)) for vid in video_files]
-for cap in caps_videos:
-    if not cap.isOpened():
-        print(f"Error: Could not open video {cap}")
-        exit()
+def make_capture(cap, name):
+    # Each source reads, flips and converts on its own worker thread (or a
+    # decoder process for files); the render loop only takes the newest
+    # finished frame. Live sources pace themselves, others at their own rate.
+    if decode_mode == "process" and not cap.is_live and not isinstance(cap, PlaceholderSource):
+        capture = ProcessCapture(cap.name, name, fps=cap.fps or 30,
+                                 size=(cap.width, cap.height), convert=convert_frames)
+        cap.release()  # the decoder process opens its own handle
+        return capture
+    return CaptureThread(cap, name, fps=None if cap.is_live else cap.fps or 30,
+                         convert=convert_frames)
 
-# Generate texture IDs
-texture_webcam = glGenTextures(1)
-texture_videos = glGenTextures(len(caps_videos))
+def open_feeds():
+    global cap_webcam, caps_videos, capture_webcam, capture_videos
+    sources, failures = open_sources_or_placeholders([webcam_source] + video_sources, source_names,
+                                                     source_open_timeout, open_feed_source)
+    for name, error in failures.items():
+        print(f"Warning: {name} unavailable ({error}); showing a placeholder")
+    for name, cap in zip(source_names, sources):
+        print(f"{name}: {cap.width}x{cap.height} at {cap.fps:g} fps ({cap.name})")
+    cap_webcam, caps_videos = sources[0], sources[1:]
+    capture_webcam = make_capture(cap_webcam, "webcam")
+    capture_videos = [make_capture(cap, name) for cap, name in zip(caps_videos, source_names[1:])]
+    # Decoder processes are spawned, not forked, so starting them after the
+    # window and the other threads is safe; they never touch GL
+    for capture in [capture_webcam] + capture_videos:
+        capture.start()
 
 # -------------------------------
 # Function to load a frame into a texture
 # -------------------------------
-def load_texture(cap, texture_id):
-    ret, frame = cap.read()
-    if not ret:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Restart video if it ends
-        ret, frame = cap.read()
-    # Use high resolution from webcam if available
-    frame = cv2.flip(frame, 0)
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    frame_data = frame.tobytes()
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, frame.shape[1], frame.shape[0],
-                 0, GL_RGB, GL_UNSIGNED_BYTE, frame_data)
+def load_texture(frame, layer):
+    # frame is either raw BGR (flipped by the shader) or already flipped RGB;
+    # it may be a view into a shared-memory ring, so hand the array to GL as-is.
+    # Conversion, if any, already happened on the capture side.
+    with profiler.stage("upload"):
+        feed_array.upload(layer, frame)
     return True
 
+# -------------------------------
+# Per-tick frame acquisition: upload the newest frame of every feed at most once
+# -------------------------------
+feed_array_reallocations = 0    # feed_array.reallocations when every layer was last filled
+
+def acquire_frames():
+    global feed_array_reallocations
+    frames = []
+    for layer, capture in enumerate([capture_webcam] + capture_videos):
+        with profiler.stage("capture"):
+            frame, is_new = capture.latest()
+        frames.append(frame)
+        # Re-uploading a duplicate frame is wasted bandwidth; the texture already holds it
+        if is_new:
+            load_texture(frame, layer)
+            if not feed_seen[layer]:
+                feed_seen[layer] = True
+                startup.mark(f"first frame: {capture.name}")
+        reads_per_frame[capture.name] = int(is_new)
+    # A larger frame reallocates the array and clears every layer; put back the
+    # current frame of each feed rather than wait for its next one (a stalled
+    # device or a placeholder may not send another for a long time)
+    if feed_array.reallocations != feed_array_reallocations:
+        for layer, frame in enumerate(frames):
+            if frame is not None:
+                load_texture(frame, layer)
+        feed_array_reallocations = feed_array.reallocations
+
+def capture_stats():
+    return {c.name: c.stats() for c in [capture_webcam] + capture_videos}
+
+# -------------------------------
+# Feed layout (see dome_layout): by default the webcam on the top cap, one
+# front segment per video, black elsewhere
+# -------------------------------
+# The fragment shader picks the feed per pixel from the layout's regions
+feed_program.set_regions(shader_regions(make_layout(feed_layout, len(source_names) - 1, **feed_layout_options)))
+# Dome tessellation follows the dome's size on screen
+dome_lod = DomeLOD(dome_radius)
+
 # -------------------------------
 # Draw Dome with Textures
 # -------------------------------
 def draw_textured_dome():
-    slices, stacks = 30, 15
-    glEnable(GL_TEXTURE_2D)
+    if feed_array.texture_id is None:
+        return  # no feed has delivered a frame yet
+    # Meshes are precomputed per LOD level; feed selection happens per pixel in
+    # the shader, so any level can be drawn with the same program
+    mesh = dome_lod.select(zoom_factor, camera_pitch)
     # Disable face culling so textures show on both sides
     glDisable(GL_CULL_FACE)
-    
-    # Loop over stacks and slices to map the dome
-    glBegin(GL_QUADS)
-    for i in range(stacks):
-        theta0 = (i / stacks) * (math.pi / 2)
-        theta1 = ((i + 1) / stacks) * (math.pi / 2)
-        for j in range(slices):
-            phi0 = (j / slices) * 2 * math.pi
-            phi1 = ((j + 1) / slices) * 2 * math.pi
-            
-            # Compute vertices in spherical coordinates
-            xA = dome_radius * math.sin(theta0) * math.cos(phi0)
-            yA = dome_radius * math.cos(theta0)
-            zA = dome_radius * math.sin(theta0) * math.sin(phi0)
-            
-            xB = dome_radius * math.sin(theta1) * math.cos(phi0)
-            yB = dome_radius * math.cos(theta1)
-            zB = dome_radius * math.sin(theta1) * math.sin(phi0)
-            
-            xC = dome_radius * math.sin(theta1) * math.cos(phi1)
-            yC = dome_radius * math.cos(theta1)
-            zC = dome_radius * math.sin(theta1) * math.sin(phi1)
-            
-            xD = dome_radius * math.sin(theta0) * math.cos(phi1)
-            yD = dome_radius * math.cos(theta0)
-            zD = dome_radius * math.sin(theta0) * math.sin(phi1)
-            
-            # Determine which texture to use for this quad:
-            # Convert phi to an adjusted value in [-pi, pi]
-            phi_avg = (phi0 + phi1) / 2.0
-            if phi_avg > math.pi:
-                phi_adjusted = phi_avg - 2 * math.pi
-            else:
-                phi_adjusted = phi_avg
-            
-            # If near the top (small theta) use live webcam feed
-            if theta0 < 0.3:
-                # Use webcam texture
-                load_texture(cap_webcam, texture_webcam)
-                glBindTexture(GL_TEXTURE_2D, texture_webcam)
-            # Else if in front region: |phi_adjusted| <= 45° (pi/4 radians)
-            elif abs(phi_adjusted) <= math.pi/4:
-                # Divide the front region (90° total) into 4 segments (each 22.5°)
-                # Map phi_adjusted from [-pi/4, pi/4] to [0, 1]
-                seg_ratio = (phi_adjusted + (math.pi/4)) / (math.pi/2)
-                seg_index = int(seg_ratio * 4)
-                seg_index = min(max(seg_index, 0), 3)
-                load_texture(caps_videos[seg_index], texture_videos[seg_index])
-                glBindTexture(GL_TEXTURE_2D, texture_videos[seg_index])
-            else:
-                # For the rest of the dome, use a default (black) color
-                glDisable(GL_TEXTURE_2D)
-                glColor3f(0, 0, 0)
-            
-            # Set texture coordinates and specify vertices for the quad
-            if glIsEnabled(GL_TEXTURE_2D):
-                glColor3f(1, 1, 1)
-                glTexCoord2f(0, 0); glVertex3f(xA, yA, zA)
-                glTexCoord2f(0, 1); glVertex3f(xB, yB, zB)
-                glTexCoord2f(1, 1); glVertex3f(xC, yC, zC)
-                glTexCoord2f(1, 0); glVertex3f(xD, yD, zD)
-            else:
-                glVertex3f(xA, yA, zA)
-                glVertex3f(xB, yB, zB)
-                glVertex3f(xC, yC, zC)
-                glVertex3f(xD, yD, zD)
-            
-            # Re-enable texture if it was disabled
-            glEnable(GL_TEXTURE_2D)
-    glEnd()
-    glDisable(GL_TEXTURE_2D)
+    feed_program.use(feed_array)
+    mesh.draw()
+    feed_program.release()
 
 # -------------------------------
-# Draw Trajectories and Hit Points (unchanged)
+# Draw Trajectories and Hit Points
 # -------------------------------
 def draw_trajectories():
-    glColor3f(1, 0, 0)
-    glBegin(GL_LINES)
-    for traj in trajectories:
-        glVertex3fv(traj[0])
-        glVertex3fv(traj[1])
-    glEnd()
-    
-    glPointSize(6)
-    glBegin(GL_POINTS)
-    for hit in dome_hits:
-        glColor3f(1, 0, 0)
-        glVertex3fv(hit)
-    for track in inside_tracks:
-        glColor3f(1, 1, 0)
-        glVertex3fv(track)
-    for base in base_hits:
-        glColor3f(1, 0, 0)
-        glVertex3fv(base)
-    glEnd()
+    trajectory_renderer.draw()
 
 # -------------------------------
-# Generate a Parabolic Trajectory Toward the Dome (unchanged)
+# Generate Parabolic Trajectories Toward the Dome (batched)
 # -------------------------------
-def generate_parabolic_trajectory():
-    angle = random.uniform(0, 2 * math.pi)
-    r_start = random.uniform(dome_radius + 100, dome_radius + 300)
-    start_x = r_start * math.cos(angle)
-    start_z = r_start * math.sin(angle)
-    start_y = 0
+trajectory_spawner = TrajectorySpawner(dome_radius, simulation_seed)
 
-    angle_end = random.uniform(0, 2 * math.pi)
-    r_end = random.uniform(0, dome_radius - 10)
-    end_x = r_end * math.cos(angle_end)
-    end_z = r_end * math.sin(angle_end)
-    end_y = 0
+def generate_parabolic_trajectory(count=1, params=None):
+    # params is (starts, controls, ends), e.g. from a replay log; by default
+    # count new trajectories are drawn from the seeded spawner
+    if params is None:
+        params = trajectory_spawner.spawn(count)
+    batch = evaluate_trajectories(*params, dome_radius, trajectory_segments)
+    trajectory_store.add_batch(batch, time.monotonic())
+    hit_grid.update()
+    hit_sectors.update()
+    return params
 
-    control_x = (start_x + end_x) / 2
-    control_z = (start_z + end_z) / 2
-    control_y = random.uniform(dome_radius / 2, dome_radius)  # high arch
+# -------------------------------
+# Picking and Sector Queries on Dome Hits
+# -------------------------------
+def pick_hit(mouse_x, mouse_y):
+    # Cast the mouse ray through the current matrices, intersect it with the
+    # dome sphere and return the nearest dome hit to that point, or None
+    viewport = glGetIntegerv(GL_VIEWPORT)
+    modelview = glGetDoublev(GL_MODELVIEW_MATRIX)
+    projection = glGetDoublev(GL_PROJECTION_MATRIX)
+    win_y = viewport[3] - mouse_y
+    near = np.array(gluUnProject(mouse_x, win_y, 0.0, modelview, projection, viewport))
+    far = np.array(gluUnProject(mouse_x, win_y, 1.0, modelview, projection, viewport))
+    direction = (far - near) / np.linalg.norm(far - near)
+    b = np.dot(near, direction)
+    disc = b * b - (np.dot(near, near) - dome_radius ** 2)
+    if disc < 0:
+        return None
+    for t in (-b - math.sqrt(disc), -b + math.sqrt(disc)):
+        point = near + t * direction
+        if t > 0 and point[1] >= 0:
+            return hit_grid.nearest(point, pick_radius)
+    return None
 
-    points = []
-    num_segments = 50
-    entered_dome = False
-    for t in np.linspace(0, 1, num_segments):
-        bx = (1 - t) ** 2 * start_x + 2 * (1 - t) * t * control_x + t ** 2 * end_x
-        by = (1 - t) ** 2 * start_y + 2 * (1 - t) * t * control_y + t ** 2 * end_y
-        bz = (1 - t) ** 2 * start_z + 2 * (1 - t) * t * control_z + t ** 2 * end_z
-        points.append((bx, by, bz))
-        
-        r = math.sqrt(bx**2 + bz**2)
-        if not entered_dome and r <= dome_radius:
-            dome_hits.append((bx, by, bz))
-            entered_dome = True
-        if r <= dome_radius:
-            inside_tracks.append((bx, by, bz))
-    
-    base_hits.append(points[-1])
-    trajectories.append((points[0], points[-1]))
+def facing_sector_hits(width=math.pi / 4):
+    # Dome hits in the phi sector the camera looks from
+    phi = math.atan2(math.cos(camera_yaw), math.sin(camera_yaw))
+    lo = (phi - width / 2 + math.pi) % (2 * math.pi) - math.pi
+    hi = (phi + width / 2 + math.pi) % (2 * math.pi) - math.pi
+    return hit_sectors.query_sector(0.0, math.pi / 2, lo, hi)
 
 # -------------------------------
-# Main Loop with Camera Controls (Arrow keys rotate; +/- zoom; Ctrl+Left click to zoom in continuously)
+# Quality settings chosen by the frame governor
+# -------------------------------
+def apply_quality(settings):
+    global trajectory_segments
+    for capture in [capture_webcam] + capture_videos:
+        # Process decoders write fixed-size rings and keep their resolution
+        if hasattr(capture, "scale"):
+            capture.scale = settings["feed_scale"]
+    dome_lod.bias = settings["lod_bias"]
+    trajectory_segments = settings["trajectory_segments"]
+
+def display_refresh_rate(default=60):
+    # Refresh rate of the primary display, so vsync pacing aims at the right
+    # vblank on 120/144 Hz screens; pygame before 2.2 cannot tell, and 0 means
+    # the driver does not know
+    try:
+        rates = pygame.display.get_desktop_refresh_rates()
+    except (AttributeError, pygame.error):
+        return default
+    return rates[0] if rates and rates[0] > 0 else default
+
+# -------------------------------
+# Main Loop with Camera Controls (Arrow keys rotate; +/- zoom; Ctrl+Left click to zoom in continuously;
+# Left click picks the nearest dome hit; S counts hits in the facing sector; F3 stage timing HUD)
 # -------------------------------
 def main():
     global camera_yaw, camera_pitch, zoom_factor
+    # Window first, so something is on screen while the sources open
     pygame.init()
-    screen = pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
+    screen = pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL, vsync=int(use_vsync))
     pygame.display.set_caption("Dome Projection: 4 Videos Front, Webcam Top")
+    glClear(GL_COLOR_BUFFER_BIT)
+    pygame.display.flip()
+    startup.mark("window")
+    open_feeds()
+    startup.mark("sources opened")
     glEnable(GL_DEPTH_TEST)
     # Disable face culling so both sides are visible
     glDisable(GL_CULL_FACE)
@@ -224,11 +342,24 @@ def main():
     gluPerspective(45, 800/600, 0.1, 3000.0)
     glMatrixMode(GL_MODELVIEW)
     
-    clock = pygame.time.Clock()
+    governor = FrameGovernor(target_fps, vsync=use_vsync, refresh_rate=display_refresh_rate(),
+                             on_change=apply_quality)
+    apply_quality(governor.settings())
+
+    replay_batches = ReplayLog(replay_path).frame_batches() if replay_path else None
+    replay_writer = None
+    if replay_record_path:
+        replay_writer = ReplayWriter(replay_record_path, dome_radius, trajectory_spawner.seed)
+    print(f"simulation seed: {trajectory_spawner.seed}")
+    session_start = time.monotonic()
+    frame = 0
+    hud = ProfilerHUD(profiler)
     running = True
     while running:
         # Process events for keyboard and mouse
-        for event in pygame.event.get():
+        with profiler.stage("events"):
+            events = pygame.event.get()
+        for event in events:
             if event.type == QUIT:
                 running = False
             if event.type == KEYDOWN:
@@ -244,14 +375,35 @@ def main():
                     zoom_factor = max(0.1, zoom_factor - 0.1)
                 elif event.key in (K_MINUS, K_KP_MINUS):
                     zoom_factor += 0.1
+                elif event.key == K_s:
+                    seqs, _ = facing_sector_hits()
+                    print(f"{len(seqs)} dome hits in the facing sector")
+                elif event.key == K_F3:
+                    profiler.enabled = not profiler.enabled
+            if event.type == MOUSEBUTTONDOWN and event.button == 1 and not (pygame.key.get_mods() & KMOD_CTRL):
+                picked = pick_hit(*event.pos)
+                if picked is not None:
+                    seq, point, _ = picked
+                    theta, phi = spherical_angles(point)
+                    print(f"dome hit #{seq} at {np.round(point, 1)} "
+                          f"(theta {math.degrees(theta):.1f}°, phi {math.degrees(phi):.1f}°)")
         
         # Continuous zoom-in when Ctrl is held and left mouse button is pressed
         if pygame.mouse.get_pressed()[0] and (pygame.key.get_mods() & KMOD_CTRL):
             zoom_factor = max(0.1, zoom_factor - 0.005)
         
-        # Randomly generate a parabolic trajectory
-        if random.random() < 0.02:
-            generate_parabolic_trajectory()
+        # Randomly generate a parabolic trajectory (or take this frame's from the log)
+        with profiler.stage("spawn"):
+            if replay_batches is not None:
+                params = replay_batches.get(frame)
+            else:
+                params = trajectory_spawner.spawn()
+            if params is not None:
+                generate_parabolic_trajectory(params=params)
+                if replay_writer is not None:
+                    replay_writer.append(frame, time.monotonic() - session_start, *params)
+            trajectory_store.expire(time.monotonic())
+        frame += 1
         
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
@@ -263,15 +415,53 @@ def main():
         cam_z = distance * math.cos(camera_yaw) * math.cos(camera_pitch)
         gluLookAt(cam_x, cam_y, cam_z, 0, dome_radius/2, 0, 0, 1, 0)
         
-        draw_textured_dome()
-        draw_trajectories()
+        with profiler.stage("acquire"):
+            acquire_frames()
+        with profiler.stage("dome"):
+            draw_textured_dome()
+        with profiler.stage("trajectories"):
+            draw_trajectories()
+        if profiler.enabled:
+            hud.draw(600)
         
-        pygame.display.flip()
-        clock.tick(30)
+        governor.work_done()
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        with profiler.stage("pace"):
+            governor.end_frame()
+        profiler.end_frame()
+        startup.mark("first frame")
+        if all(feed_seen):
+            startup.mark("all feeds")
+        if measure_startup and (all(feed_seen) or time.perf_counter() - startup.origin > startup_measure_limit):
+            running = False
     
-    cap_webcam.release()
-    for cap in caps_videos:
-        cap.release()
+    report = startup.report()
+    print("startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in report["marks_ms"].items()))
+    if measure_startup:
+        print(json.dumps(report))
+        if startup_report_path:
+            with open(startup_report_path, "w") as f:
+                json.dump(report, f)
+    if replay_writer is not None:
+        replay_writer.close()
+        print(f"{replay_writer.count} trajectories logged to {replay_record_path}")
+    print(f"frame governor: {governor.stats()}")
+    if profiler.frames:
+        for name, values in profiler.percentiles().items():
+            print(f"stage {name}: " + ", ".join(f"{q} {ms:.2f} ms" for q, ms in values.items()))
+        if profile_trace_path:
+            profiler.export_chrome_trace(profile_trace_path)
+        if profile_csv_path:
+            profiler.export_csv(profile_csv_path)
+    for name, stats in capture_stats().items():
+        print(f"{name}: {stats['captured']} captured, {stats['dropped']} dropped, "
+              f"{stats['duplicated']} duplicated, {stats['allocations']} frame allocations")
+    capture_webcam.stop()
+    for capture in capture_videos:
+        capture.stop()
+    if use_frame_cache:
+        frame_cache.close()
     pygame.quit()
 
 if __name__ == "__main__":